@@ -1,11 +1,10 @@
-import { useState, useRef, useEffect, useDeferredValue, useMemo } from "react";
+import { lazy, Suspense, useState, useRef, useEffect, useDeferredValue, useMemo } from "react";
 import { type PosterSize } from "@/components/artistic-map";
 import { Square, Smartphone, Monitor, FileImage } from "lucide-react";
 import { useLocationData } from "@/hooks/useLocationData";
 import { getUserGeolocation } from "@/services/ip-geolocation";
 
-// WASM and Utils
-import init, { init_panic_hook } from "./pkg/wasm";
+// Utils（WASM 只在 worker.ts 中加载，主线程不再实例化）
 import { shardRoadsBinary } from "./utils";
 import { type MapColors, MAP_THEMES as THEMES, type Location } from "@/lib/types";
 import { mapDataService } from "./services/map-data";
@@ -14,18 +13,22 @@ import { type State, type City } from "@/services/location-types";
 import * as m from "@/paraglide/messages";
 import { getLocale, setLocale, locales } from "@/paraglide/runtime";
 import { useDynamicFont } from "./hooks/useDynamicFont";
-import { PosterGallery } from "./components/gallery";
 import Footer from "./components/footer";
 import { SEOHead } from "./hooks/useSEO";
 import { AppHeader } from "./components/app-header";
 import { LocationSettings } from "./components/location-settings";
-import { DataSettings } from "./components/data-settings";
+import { DataSettings, normalizeBaseRadius } from "./components/data-settings";
 import { ThemeColors } from "./components/theme-colors";
 import { FontSettings } from "./components/font-settings";
 import { PosterSizeSelector } from "./components/poster-size-selector";
 import { MapPreview } from "./components/map-preview";
 import { GenerationModal } from "./components/generation-modal";
 
+// 画廊位于页面底部，单独拆包，不阻塞首屏的编辑器与预览
+const PosterGallery = lazy(() =>
+  import("./components/gallery").then((mod) => ({ default: mod.PosterGallery }))
+);
+
 type AvailableLanguageTag = (typeof locales)[number];
 
 // Extended PosterSize includes icon for size selector UI
@@ -34,7 +37,7 @@ interface LocalPosterSize extends PosterSize {
 }
 
 // Worker task types
-type WorkerTaskType = "roads" | "polygons" | "pois" | "render";
+type WorkerTaskType = "roads" | "polygons" | "render";
 
 interface RenderOptions {
   roads_shards: Float64Array[];
@@ -86,6 +89,61 @@ const EXAMPLES: { location: Location; themeId: string }[] = [
   },
 ];
 
+// WASM Worker 池：跨多次导出复用，省去每次新建 Worker 并重新加载/实例化 WASM 的开销
+// 代价是 WASM 线性内存只增不减：一次 A4 导出后 workers[0] 仅 2× 画布就约 139 MB，
+// 只有 terminate 才能把内存还给浏览器。因此池只在连续导出之间保留，
+// 空闲超过 WORKER_POOL_IDLE_MS 或页面切到后台时整体销毁，下次导出再重建
+const WORKER_POOL_IDLE_MS = 60_000;
+// 池中 Worker 数达到该值时，水体和公园任务才各分配一个专用 Worker
+const MIN_WORKERS_FOR_DEDICATED_POLYGONS = 6;
+let workerPool: Worker[] | null = null;
+let workerPoolInUse = 0;
+let workerPoolIdleTimer: ReturnType<typeof setTimeout> | null = null;
+
+// 取用池时必须与 releaseWorkerPool 成对调用
+function getWorkerPool(): Worker[] {
+  if (workerPoolIdleTimer !== null) {
+    clearTimeout(workerPoolIdleTimer);
+    workerPoolIdleTimer = null;
+  }
+  workerPoolInUse++;
+  if (!workerPool) {
+    const numWorkers = navigator.hardwareConcurrency || 4;
+    workerPool = Array.from(
+      { length: numWorkers },
+      () => new Worker(new URL("./worker.ts", import.meta.url), { type: "module" })
+    );
+  }
+  return workerPool;
+}
+
+// 导出结束后归还池：没有进行中的导出时开始空闲计时，到期后销毁
+function releaseWorkerPool() {
+  workerPoolInUse = Math.max(0, workerPoolInUse - 1);
+  if (workerPoolInUse === 0 && workerPool) {
+    workerPoolIdleTimer = setTimeout(resetWorkerPool, WORKER_POOL_IDLE_MS);
+  }
+}
+
+// Worker 崩溃或 WASM panic 后丢弃整个池 (实例不可再用)，下次导出重新创建；
+// 空闲到期或页面切到后台时同样走这里
+function resetWorkerPool() {
+  if (workerPoolIdleTimer !== null) {
+    clearTimeout(workerPoolIdleTimer);
+    workerPoolIdleTimer = null;
+  }
+  workerPool?.forEach((w) => w.terminate());
+  workerPool = null;
+}
+
+// Worker 本身不可再用 (error 事件或 WASM panic)；网络、校验等普通错误不会抛出它，池可继续复用
+class WorkerCrashError extends Error {
+  constructor(message: string) {
+    super(message);
+    this.name = "WorkerCrashError";
+  }
+}
+
 // Worker task helper
 let taskIdCounter = 0;
 function runInWorker(
@@ -99,15 +157,20 @@ function runInWorker(
     const handler = (event: MessageEvent) => {
       if (event.data.id === id) {
         worker.removeEventListener("message", handler);
+        // Worker 会被复用，任务结束后必须同时移除 error 监听，避免监听器累积
+        worker.removeEventListener("error", errorHandler);
         if (event.data.success) {
           resolve(event.data.result);
+        } else if (event.data.panicked) {
+          reject(new WorkerCrashError(`Worker Panic: ${event.data.error}`));
         } else {
           reject(new Error(`Worker Protocol Error: ${event.data.error}`));
         }
       }
     };
     const errorHandler = (error: ErrorEvent) => {
-      reject(new Error(`Worker Crash: ${error.message}`));
+      worker.removeEventListener("message", handler);
+      reject(new WorkerCrashError(`Worker Crash: ${error.message}`));
     };
     worker.addEventListener("message", handler);
     worker.addEventListener("error", errorHandler, { once: true });
@@ -143,90 +206,99 @@ export default function MapPosterGenerator() {
   const previewRef = useRef<HTMLDivElement>(null);
 
   // Localized Sizes
-  const SIZES: LocalPosterSize[] = [
-    {
-      id: "iphone",
-      name: m.size_iphone(),
-      width: 1500,
-      height: 3200,
-      icon: <Smartphone className="w-4 h-4" />,
-    },
-    {
-      id: "square",
-      name: m.size_square(),
-      width: 3000,
-      height: 3000,
-      icon: <Square className="w-4 h-4" />,
-    },
-    {
-      id: "poster-3x4-portrait",
-      name: m.size_poster_3x4_portrait(),
-      width: 2400,
-      height: 3200,
-      icon: <FileImage className="w-4 h-4" />,
-    },
-    {
-      id: "poster-9x16-portrait",
-      name: m.size_poster_9x16_portrait(),
-      width: 2160,
-      height: 3840,
-      icon: <FileImage className="w-4 h-4" />,
-    },
-    {
-      id: "poster-4x3-landscape",
-      name: m.size_poster_4x3_landscape(),
-      width: 3200,
-      height: 2400,
-      icon: <Monitor className="w-4 h-4" />,
-    },
-    {
-      id: "desktop",
-      name: m.size_desktop(),
-      width: 3840,
-      height: 2160,
-      icon: <Monitor className="w-4 h-4" />,
-    },
-    {
-      id: "a4-portrait",
-      name: m.size_a4_portrait(),
-      width: 2480,
-      height: 3508,
-      icon: <FileImage className="w-4 h-4" />,
-    },
-    {
-      id: "a4-landscape",
-      name: m.size_a4_landscape(),
-      width: 3508,
-      height: 2480,
-      icon: <FileImage className="w-4 h-4 rotate-90" />,
-    },
-  ];
+  // 尺寸列表（含图标元素）只随语言变化，不必每次渲染都重新创建；
+  // 显式传入 locale，使 activeLang 成为 useMemo 的真实依赖，而非隐式依赖全局 getLocale()
+  const SIZES = useMemo<LocalPosterSize[]>(
+    () => [
+      {
+        id: "iphone",
+        name: m.size_iphone({}, { locale: activeLang }),
+        width: 1500,
+        height: 3200,
+        icon: <Smartphone className="w-4 h-4" />,
+      },
+      {
+        id: "square",
+        name: m.size_square({}, { locale: activeLang }),
+        width: 3000,
+        height: 3000,
+        icon: <Square className="w-4 h-4" />,
+      },
+      {
+        id: "poster-3x4-portrait",
+        name: m.size_poster_3x4_portrait({}, { locale: activeLang }),
+        width: 2400,
+        height: 3200,
+        icon: <FileImage className="w-4 h-4" />,
+      },
+      {
+        id: "poster-9x16-portrait",
+        name: m.size_poster_9x16_portrait({}, { locale: activeLang }),
+        width: 2160,
+        height: 3840,
+        icon: <FileImage className="w-4 h-4" />,
+      },
+      {
+        id: "poster-4x3-landscape",
+        name: m.size_poster_4x3_landscape({}, { locale: activeLang }),
+        width: 3200,
+        height: 2400,
+        icon: <Monitor className="w-4 h-4" />,
+      },
+      {
+        id: "desktop",
+        name: m.size_desktop({}, { locale: activeLang }),
+        width: 3840,
+        height: 2160,
+        icon: <Monitor className="w-4 h-4" />,
+      },
+      {
+        id: "a4-portrait",
+        name: m.size_a4_portrait({}, { locale: activeLang }),
+        width: 2480,
+        height: 3508,
+        icon: <FileImage className="w-4 h-4" />,
+      },
+      {
+        id: "a4-landscape",
+        name: m.size_a4_landscape({}, { locale: activeLang }),
+        width: 3508,
+        height: 2480,
+        icon: <FileImage className="w-4 h-4 rotate-90" />,
+      },
+    ],
+    [activeLang]
+  );
 
   const [selectedSize, setSelectedSize] = useState(SIZES[0]);
 
   // Map theme IDs to translation functions
-  const themeNameMap: Record<string, string> = {
-    "Nordic-Frost": m.theme_nordic_frost(),
-    "Desert-Rose": m.theme_desert_rose(),
-    "Cyberpunk-Neon": m.theme_cyberpunk_neon(),
-    "Sulfur-Slate": m.theme_sulfur_slate(),
-    "Vintage-Nautical": m.theme_vintage_nautical(),
-    "Lavender-Mist": m.theme_lavender_mist(),
-    "Carbon-Fiber": m.theme_carbon_fiber(),
-    "Mediterranean-Summer": m.theme_mediterranean_summer(),
-    "Royal-Velvet": m.theme_royal_velvet(),
-    "Forest-Moss": m.theme_forest_moss(),
-    "Cotton-Candy": m.theme_cotton_candy(),
-    "Brutalist-Concrete": m.theme_brutalist_concrete(),
-    "Solarized-Dark": m.theme_solarized_dark(),
-    "Matcha-Latte": m.theme_matcha_latte(),
-    "Red-Alert": m.theme_red_alert(),
-    "Gilded-Noir": m.theme_gilded_noir(),
-    "Ocean-Abyss": m.theme_ocean_abyss(),
-    "Sakura-Branch": m.theme_sakura_branch(),
-    "Terra-Clay": m.theme_terra_clay(),
-    "Glitch-Purple": m.theme_glitch_purple(),
-  };
+  // 只在切换语言时重建；显式传入 locale，使 activeLang 成为 useMemo 的真实依赖
+  const themeNameMap = useMemo<Record<string, string>>(
+    () => ({
+      "Nordic-Frost": m.theme_nordic_frost({}, { locale: activeLang }),
+      "Desert-Rose": m.theme_desert_rose({}, { locale: activeLang }),
+      "Cyberpunk-Neon": m.theme_cyberpunk_neon({}, { locale: activeLang }),
+      "Sulfur-Slate": m.theme_sulfur_slate({}, { locale: activeLang }),
+      "Vintage-Nautical": m.theme_vintage_nautical({}, { locale: activeLang }),
+      "Lavender-Mist": m.theme_lavender_mist({}, { locale: activeLang }),
+      "Carbon-Fiber": m.theme_carbon_fiber({}, { locale: activeLang }),
+      "Mediterranean-Summer": m.theme_mediterranean_summer({}, { locale: activeLang }),
+      "Royal-Velvet": m.theme_royal_velvet({}, { locale: activeLang }),
+      "Forest-Moss": m.theme_forest_moss({}, { locale: activeLang }),
+      "Cotton-Candy": m.theme_cotton_candy({}, { locale: activeLang }),
+      "Brutalist-Concrete": m.theme_brutalist_concrete({}, { locale: activeLang }),
+      "Solarized-Dark": m.theme_solarized_dark({}, { locale: activeLang }),
+      "Matcha-Latte": m.theme_matcha_latte({}, { locale: activeLang }),
+      "Red-Alert": m.theme_red_alert({}, { locale: activeLang }),
+      "Gilded-Noir": m.theme_gilded_noir({}, { locale: activeLang }),
+      "Ocean-Abyss": m.theme_ocean_abyss({}, { locale: activeLang }),
+      "Sakura-Branch": m.theme_sakura_branch({}, { locale: activeLang }),
+      "Terra-Clay": m.theme_terra_clay({}, { locale: activeLang }),
+      "Glitch-Purple": m.theme_glitch_purple({}, { locale: activeLang }),
+    }),
+    [activeLang]
+  );
 
   // Location selection state
   const [selectedCountry, setSelectedCountry] = useState<string>("");
@@ -282,6 +354,17 @@ export default function MapPosterGenerator() {
     document.title = `${m.app_title()} - ${m.app_subtitle()}`;
   };
 
+  // 页面切到后台时不必等空闲计时，直接释放 Worker 池占用的内存
+  useEffect(() => {
+    const handleVisibilityChange = () => {
+      if (document.visibilityState === "hidden" && workerPoolInUse === 0) {
+        resetWorkerPool();
+      }
+    };
+    document.addEventListener("visibilitychange", handleVisibilityChange);
+    return () => document.removeEventListener("visibilitychange", handleVisibilityChange);
+  }, []);
+
   // Persistence Handling
   const isRestored = useRef(false);
 
@@ -324,7 +407,15 @@ export default function MapPosterGenerator() {
 
         // Restore LOD & Radius
         if (config.lodMode) setLodMode(config.lodMode);
-        if (config.baseRadius) setBaseRadius(config.baseRadius);
+        if (config.baseRadius) {
+          // 旧版本或被改写的配置可能超出可选范围或不在步长上：过大的半径会触发超大范围的
+          // Overpass 下载，不在步长上的值在半径下拉框里没有对应项
+          const radius = normalizeBaseRadius(config.baseRadius);
+          if (radius !== config.baseRadius) {
+            console.warn(`Saved radius ${config.baseRadius}m is not selectable, using ${radius}m`);
+          }
+          setBaseRadius(radius);
+        }
 
         // Restore Location Text/Coords
         if (config.customTitle) setCustomTitle(config.customTitle);
@@ -745,16 +836,6 @@ export default function MapPosterGenerator() {
     }
   };
 
-  useEffect(() => {
-    init()
-      .then(() => {
-        init_panic_hook();
-      })
-      .catch((err) => {
-        console.error("Failed to initialize WASM:", err);
-      });
-  }, []);
-
   const handleDownload = async () => {
     setIsGenerating(true);
     setGenerationProgress(0);
@@ -762,11 +843,8 @@ export default function MapPosterGenerator() {
     generationCompleteRef.current = false;
     isGameOpenRef.current = false;
     await yieldMainThread();
-    const numWorkers = navigator.hardwareConcurrency || 4;
-    const workers = Array.from(
-      { length: numWorkers },
-      () => new Worker(new URL("./worker.ts", import.meta.url), { type: "module" })
-    );
+    const workers = getWorkerPool();
+    const numWorkers = workers.length;
 
     // 设置进度回调，用于接收 data-worker 发来的进度更新
     const progressHandler = (progress: number, step: string) => {
@@ -809,56 +887,98 @@ export default function MapPosterGenerator() {
       setGenerationStep(m.step_fetching_data());
       await yieldMainThread();
 
-      // 获取地图数据 (包含 POI)
-      // 下载范围使用固定的 canonical fetch viewport，避免同半径切换画幅时重新拉取数据。
-      const mapResults = await mapDataService.getMapData(
-        location.country,
-        location.city,
-        lat,
-        lng,
-        baseRadius,
-        lodMode
-      );
-
-      const { roads, water, parks, pois: poisRaw, fromCache, cacheLevel, isProtomaps } = mapResults;
+      // 已投影数据与主题/画幅无关：命中时直接渲染，跳过数据获取和 Worker 投影
+      let projected = mapDataService.getProjectedMapData(lat, lng, baseRadius, lodMode);
 
-      // 根据缓存层级设置最终消息
-      if (cacheLevel === "memory") {
-        setGenerationProgress(60);
+      if (projected) {
+        setGenerationProgress(70);
         setGenerationStep(m.step_restore_memory());
+        await yieldMainThread();
       } else {
-        setGenerationProgress(60);
-        setGenerationStep(fromCache ? m.step_restore_cache() : m.step_fetch_complete());
-      }
-      await yieldMainThread();
+        // 获取地图数据 (包含 POI)
+        // 下载范围使用固定的 canonical fetch viewport，避免同半径切换画幅时重新拉取数据。
+        const mapResults = await mapDataService.getMapData(
+          location.country,
+          location.city,
+          lat,
+          lng,
+          baseRadius,
+          lodMode
+        );
 
-      setGenerationProgress(70);
-      setGenerationStep(m.step_processing());
-      await yieldMainThread();
+        const {
+          roads,
+          water,
+          parks,
+          pois: poisRaw,
+          fromCache,
+          cacheLevel,
+          isProtomaps,
+        } = mapResults;
+
+        // 根据缓存层级设置最终消息
+        if (cacheLevel === "memory") {
+          setGenerationProgress(60);
+          setGenerationStep(m.step_restore_memory());
+        } else {
+          setGenerationProgress(60);
+          setGenerationStep(fromCache ? m.step_restore_cache() : m.step_fetch_complete());
+        }
+        await yieldMainThread();
 
-      const roadShards = shardRoadsBinary(roads, numWorkers);
-      // 这里的 TypedArray 是之后会被 transfer 的
-      const waterTyped = water;
-      const parksTyped = parks;
-      const poisTyped = poisRaw;
+        setGenerationProgress(70);
+        setGenerationStep(m.step_processing());
+        await yieldMainThread();
 
-      // 并行处理：道路、水体、公园
-      // 注意：使用取模确保索引永远在 workers 范围内
-      const roadProcessingPromises = roadShards.map((shard, i) =>
-        runInWorker(workers[i % numWorkers], "roads", shard, [shard.buffer])
-      );
+        // 道路是投影的主要开销：Worker 足够多时，水体、公园才各独占池末尾的一个 Worker，
+        // 道路在剩余 Worker 上分片；否则道路铺满整个池，多边形任务在末尾 Worker 上
+        // 排在道路分片之后 (Worker 按消息顺序执行)
+        const roadWorkers =
+          numWorkers >= MIN_WORKERS_FOR_DEDICATED_POLYGONS ? numWorkers - 2 : numWorkers;
+        const roadShards = shardRoadsBinary(roads, roadWorkers);
+        // 这里的 TypedArray 是之后会被 transfer 的
+        const waterTyped = water;
+        const parksTyped = parks;
+        // POI 已是最简形式 [poi_count, x1, y1, ...]，由渲染阶段在 WASM 内投影；
+        // 不再单独派发一个原样返回的 Worker 任务，省掉两次 postMessage 往返
+        const poisBin = poisRaw;
+
+        // 并行处理：道路、水体、公园
+        // 注意：使用取模确保索引永远在 workers 范围内
+        const roadProcessingPromises = roadShards.map((shard, i) =>
+          runInWorker(workers[i % roadWorkers], "roads", shard, [shard.buffer])
+        );
 
-      const [processedRoadShards, waterBin, parksBin, poisBin] = await Promise.all([
-        Promise.all(roadProcessingPromises),
-        runInWorker(workers[0 % numWorkers], "polygons", waterTyped, [waterTyped.buffer]),
-        runInWorker(workers[1 % numWorkers], "polygons", parksTyped, [parksTyped.buffer]),
-        runInWorker(workers[2 % numWorkers], "pois", poisTyped, [poisTyped.buffer]),
-      ]);
+        const waterWorker = workers[numWorkers - 1];
+        const parksWorker = workers[Math.max(0, numWorkers - 2)];
+        const [processedRoadShards, waterBin, parksBin] = await Promise.all([
+          Promise.all(roadProcessingPromises),
+          runInWorker(waterWorker, "polygons", waterTyped, [waterTyped.buffer]),
+          runInWorker(parksWorker, "polygons", parksTyped, [parksTyped.buffer]),
+        ]);
+
+        // 数据处理完成
+        setGenerationProgress(70);
+        setGenerationStep(m.step_processing_complete());
+        await yieldMainThread();
 
-      // 数据处理完成
-      setGenerationProgress(70);
-      setGenerationStep(m.step_processing_complete());
-      await yieldMainThread();
+        projected = {
+          roadShards: processedRoadShards as Float64Array[],
+          water: waterBin as Float64Array,
+          parks: parksBin as Float64Array,
+          pois: poisBin,
+          isProtomaps,
+        };
+        mapDataService.setProjectedMapData(lat, lng, baseRadius, lodMode, projected);
+      }
+
+      const {
+        roadShards: processedRoadShards,
+        water: waterBin,
+        parks: parksBin,
+        pois: poisBin,
+        isProtomaps,
+      } = projected;
 
       // 准备渲染配置
       const config = {
@@ -873,7 +993,9 @@ export default function MapPosterGenerator() {
         selected_size_height: selectedSize.height * FRONTEND_SCALE,
         frontend_scale: FRONTEND_SCALE,
         road_width_boost: isProtomaps ? 1.8 : 1.0,
-        pois: Array.from(poisBin),
+        // POI 经纬度保留 6 位小数 (~0.1m，海报上不可见)，缩短 JSON 文本，
+        // 减少 JSON.stringify 和 WASM 端 serde_json 解析浮点数的开销；[0] 为整数计数不受影响
+        pois: Array.from(poisBin, (v) => Math.round(v * 1e6) / 1e6),
       };
 
       setGenerationProgress(90);
@@ -930,6 +1052,7 @@ export default function MapPosterGenerator() {
       }
     } catch (error) {
       console.error(m.error_generating(), error);
+      if (error instanceof WorkerCrashError) resetWorkerPool();
       alert(m.error_generating() + (error instanceof Error ? error.message : String(error)));
     } finally {
       console.log(
@@ -942,13 +1065,13 @@ export default function MapPosterGenerator() {
         new Date().toISOString()
       );
       mapDataService.setProgressCallback(null);
+      releaseWorkerPool();
       if (!isGameOpenRef.current) {
         console.log("[App] finally: closing loading because game is not open");
         setIsGenerating(false);
       } else {
         console.log("[App] finally: game is open, NOT closing loading");
       }
-      workers.forEach((w) => w.terminate());
     }
   };
 
@@ -1050,7 +1173,9 @@ export default function MapPosterGenerator() {
               previewRef={previewRef}
             />
           </div>
-          <PosterGallery />
+          <Suspense fallback={null}>
+            <PosterGallery />
+          </Suspense>
           <Footer />
         </main>
       </div>
@@ -9,6 +9,7 @@
 import { useEffect, useRef, useState } from "react";
 import maplibregl from "maplibre-gl";
 import "maplibre-gl/dist/maplibre-gl.css";
+import { formatCityName, formatCoordinates } from "@/lib/poster-text";
 
 function isValidHexColor(color: string): boolean {
   return /^#([0-9A-Fa-f]{3}|[0-9A-Fa-f]{6}|[0-9A-Fa-f]{8})$/.test(color);
@@ -284,24 +285,6 @@ function applyThemePaintProperties(map: maplibregl.Map, theme: ArtisticTheme) {
 // 工具函数
 // ============================================
 
-function isLatinScript(text: string): boolean {
-  const latinRegex = /[\u0000-\u007F\u0080-\u00FF\u0100-\u017F\u0180-\u024F]/;
-  let latinCount = 0,
-    totalAlpha = 0;
-  for (const char of text) {
-    if (/[a-zA-Z]/.test(char)) {
-      totalAlpha++;
-      if (latinRegex.test(char)) latinCount++;
-    }
-  }
-  return totalAlpha > 0 && latinCount / totalAlpha > 0.8;
-}
-
-function formatCityName(city: string): string {
-  if (isLatinScript(city)) return city.split("").join("  ");
-  return city;
-}
-
 /// 动态计算字体大小（与 WASM 端 calculate_font_size 逻辑一致）
 function calculateFontSize(text: string, baseSize: number, threshold: number): number {
   if (text.length > threshold) {
@@ -310,12 +293,6 @@ function calculateFontSize(text: string, baseSize: number, threshold: number): n
   return baseSize;
 }
 
-function formatCoordinates(lat: number, lon: number): string {
-  const latDir = lat >= 0 ? "N" : "S";
-  const lonDir = lon >= 0 ? "E" : "W";
-  return `${Math.abs(lat).toFixed(4)}° ${latDir} / ${Math.abs(lon).toFixed(4)}° ${lonDir}`;
-}
-
 // ============================================
 // 文字叠加层
 // ============================================
@@ -377,7 +354,7 @@ function TextOverlay({
   return (
     <div style={{ position: "absolute", top: 0, left: 0, right: 0, bottom: 0, overflow: "hidden" }}>
       <span style={{ ...baseStyle, top: cityY, fontSize: `${cityFontSize}px`, fontWeight: 400 }}>
-        {formatCityName(city)}
+        {formattedCity}
       </span>
       <span
         style={{ ...baseStyle, top: countryY, fontSize: `${countryFontSize}px`, fontWeight: 400 }}
@@ -501,7 +478,9 @@ export function MapPosterPreview({
       center: [initLon, initLat],
       zoom: zoom,
       attributionControl: false,
-      canvasContextAttributes: { preserveDrawingBuffer: true },
+      // 预览画布从不被读回像素（导出走 WASM 渲染），不保留绘制缓冲区，
+      // 避免 WebGL 每帧额外拷贝一次整块帧缓冲
+      canvasContextAttributes: { preserveDrawingBuffer: false },
       interactive: false,
     });
 
@@ -10,6 +10,24 @@ import {
 import { Settings2 } from "lucide-react";
 import * as m from "@/paraglide/messages";
 
+// 可选半径范围（米），步长 1000
+const MIN_BASE_RADIUS = 3000;
+const MAX_BASE_RADIUS = 20000;
+const RADIUS_STEP = 1000;
+const RADIUS_OPTIONS = Array.from(
+  { length: (MAX_BASE_RADIUS - MIN_BASE_RADIUS) / RADIUS_STEP + 1 },
+  (_, i) => MIN_BASE_RADIUS + i * RADIUS_STEP
+);
+
+/**
+ * 把任意半径归一到 RADIUS_OPTIONS 中的某一项：先钳制到可选范围，再对齐到步长
+ * 恢复本地配置时与下拉框共用，旧版本或被改写的值 (如 7500) 也能在 Select 中显示
+ */
+export function normalizeBaseRadius(radius: number): number {
+  const clamped = Math.min(Math.max(radius, MIN_BASE_RADIUS), MAX_BASE_RADIUS);
+  return Math.round((clamped - MIN_BASE_RADIUS) / RADIUS_STEP) * RADIUS_STEP + MIN_BASE_RADIUS;
+}
+
 interface DataSettingsProps {
   baseRadius: number;
   onBaseRadiusChange: (val: number) => void;
@@ -31,14 +49,14 @@ export function DataSettings({ baseRadius, onBaseRadiusChange }: DataSettingsPro
             <span className="text-xs font-mono text-primary">{baseRadius}m</span>
           </div>
           <Select
-            value={baseRadius.toString()}
+            value={normalizeBaseRadius(baseRadius).toString()}
             onValueChange={(val) => onBaseRadiusChange(parseInt(val))}
           >
             <SelectTrigger className="w-full h-9 border-border bg-card">
               <SelectValue />
             </SelectTrigger>
             <SelectContent>
-              {Array.from({ length: 18 }, (_, i) => 3000 + i * 1000).map((radius) => (
+              {RADIUS_OPTIONS.map((radius) => (
                 <SelectItem key={radius} value={radius.toString()}>
                   {radius}m
                 </SelectItem>
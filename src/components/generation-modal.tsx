@@ -2,10 +2,12 @@ import { Card } from "@/components/ui/card";
 import { Button } from "@/components/ui/button";
 import { Progress } from "@/components/ui/progress";
 import { Clock } from "lucide-react";
-import { useState, useEffect } from "react";
-import SnakeGame from "@/components/snake-game";
+import { lazy, Suspense, useState, useEffect } from "react";
 import * as m from "@/paraglide/messages";
 
+// 小游戏只在生成弹窗打开后才需要，单独拆包，首屏不加载
+const SnakeGame = lazy(() => import("@/components/snake-game"));
+
 interface GenerationModalProps {
   isGenerating: boolean;
   generationProgress: number;
@@ -75,21 +77,23 @@ export function GenerationModal({
           >
             {generationProgress === 100 && isGameOpen ? m.game_complete_hint() : generationStep}
           </p>
-          <SnakeGame
-            inline={true}
-            onOpenChange={(open) => {
-              onGameOpenChange(open);
-              if (!open && generationCompleteRef.current) {
-                onClose();
-                generationCompleteRef.current = false;
-              }
-            }}
-            // 当用户有任何交互（键盘方向键或 UI 方向键）时，不再自动关闭
-            onUserInteracted={() => {
-              setHasUserInteracted(true);
-            }}
-            triggerLabel={triggerLabel}
-          />
+          <Suspense fallback={null}>
+            <SnakeGame
+              inline={true}
+              onOpenChange={(open) => {
+                onGameOpenChange(open);
+                if (!open && generationCompleteRef.current) {
+                  onClose();
+                  generationCompleteRef.current = false;
+                }
+              }}
+              // 当用户有任何交互（键盘方向键或 UI 方向键）时，不再自动关闭
+              onUserInteracted={() => {
+                setHasUserInteracted(true);
+              }}
+              triggerLabel={triggerLabel}
+            />
+          </Suspense>
           <div
             className="flex justify-end pt-2"
             style={{
@@ -37,13 +37,14 @@ import { mergeSeaPolygonsIntoWaterGeoJSON } from "./services/sea-polygons";
 import {
   MAP_DATA_CACHE_VERSION,
   bboxToPolygon,
+  buildMapDataLocationKey,
   buildCanonicalFetchRadiusMeters,
   buildCanonicalFetchViewportBbox,
 } from "./lib/poster-viewport";
 // 导入 getOverpassPause 用于进度更新
 import { type OverpassProgressCallback } from "./services/overpass-client";
 
-import { getDB, compress, decompress } from "./db";
+import { getDB, compressBinary, decompressBinary } from "./db";
 
 const STORE_NAME = "geojson-cache";
 const USE_PROTOMAPS = false; // MVP 开关：设置为 true 开启 Protomaps 高速抓取
@@ -90,18 +91,65 @@ function createProgressCallback(
   };
 }
 
+// 并发下载共用的进度回调：进度取自 baseProgress() 的最新值，
+// 各下载的等待/重试倒计时分别记录，合并成一条状态再发送——
+// 任一下载在错误重试时显示最长的重试倒计时，否则任一下载在等 API 槽位时显示最长的等待倒计时，
+// 都没有在等待时显示 baseStep。避免多个下载的倒计时在同一行状态里互相覆盖
+function createConcurrentProgress(
+  count: number,
+  baseProgress: () => number,
+  baseStep: string
+): { callbacks: OverpassProgressCallback[]; report: () => void } {
+  const waits: ({ retrying: boolean; seconds: number } | null)[] = new Array(count).fill(null);
+
+  const report = () => {
+    let retrySeconds = -1;
+    let waitSeconds = -1;
+    for (const wait of waits) {
+      if (!wait) continue;
+      if (wait.retrying) retrySeconds = Math.max(retrySeconds, wait.seconds);
+      else waitSeconds = Math.max(waitSeconds, wait.seconds);
+    }
+    if (retrySeconds >= 0) {
+      sendProgress(baseProgress(), `step_retrying_error:${retrySeconds}`);
+    } else if (waitSeconds >= 0) {
+      sendProgress(baseProgress(), `step_waiting_api:${waitSeconds}`);
+    } else {
+      sendProgress(baseProgress(), baseStep);
+    }
+  };
+
+  const callbacks = waits.map(
+    (_, i): OverpassProgressCallback =>
+      (_progress, step, _currentBlock, _totalBlocks, secondsRemaining) => {
+        if (step === "waiting_slot" && secondsRemaining !== undefined) {
+          waits[i] = { retrying: false, seconds: secondsRemaining };
+        } else if (step === "retrying_error" && secondsRemaining !== undefined) {
+          waits[i] = { retrying: true, seconds: secondsRemaining };
+        } else {
+          waits[i] = null;
+        }
+        report();
+      }
+  );
+
+  return { callbacks, report };
+}
+
 function createMapDataCacheKey(
-  country: string,
-  city: string,
+  lat: number,
+  lng: number,
   baseRadius: number,
   lodMode: "simplified" | "detailed",
   type: string
 ) {
-  return `map_data:${MAP_DATA_CACHE_VERSION}:${country}:${city}:${baseRadius}:${lodMode}:${type}`;
+  const location = buildMapDataLocationKey(lat, lng);
+  return `map_data:${MAP_DATA_CACHE_VERSION}:${location}:${baseRadius}:${lodMode}:${type}`;
 }
 
-function createPOIsCacheKey(country: string, city: string, baseRadius: number) {
-  return `map_data:${MAP_DATA_CACHE_VERSION}:${country}:${city}:${baseRadius}:pois`;
+function createPOIsCacheKey(lat: number, lng: number, baseRadius: number) {
+  const location = buildMapDataLocationKey(lat, lng);
+  return `map_data:${MAP_DATA_CACHE_VERSION}:${location}:${baseRadius}:pois`;
 }
 
 self.onmessage = async (event: MessageEvent) => {
@@ -128,23 +176,28 @@ self.onmessage = async (event: MessageEvent) => {
       };
 
       // 1. 检查 IndexedDB 缓存 (包含 POI)
+      // [优化] 4 个 key 的读取互不依赖，一次性并发发起，避免逐个 await 串行等待
       const types = ["roads", "water", "parks"];
       const cachedBlobs: Record<string, Blob | undefined> = {};
-      let allCached = true;
+      const poisCacheKey = createPOIsCacheKey(lat, lng, baseRadius);
+
+      const [poisCachedBlob, ...typeBlobs] = await Promise.all([
+        db.get(STORE_NAME, poisCacheKey),
+        ...types.map((t) =>
+          db.get(STORE_NAME, createMapDataCacheKey(lat, lng, baseRadius, lodMode, t))
+        ),
+      ]);
 
-      for (const t of types) {
-        const key = createMapDataCacheKey(country, city, baseRadius, lodMode, t);
-        const blob = await db.get(STORE_NAME, key);
-        if (blob) {
-          cachedBlobs[t] = blob;
+      let allCached = true;
+      types.forEach((t, i) => {
+        if (typeBlobs[i]) {
+          cachedBlobs[t] = typeBlobs[i];
         } else {
           allCached = false;
         }
-      }
+      });
 
       // POI 缓存检查
-      const poisCacheKey = createPOIsCacheKey(country, city, baseRadius);
-      const poisCachedBlob = await db.get(STORE_NAME, poisCacheKey);
       let poisCached = !!poisCachedBlob;
 
       if (allCached && poisCached) {
@@ -152,23 +205,18 @@ self.onmessage = async (event: MessageEvent) => {
         // 发送缓存恢复进度
         sendProgress(60, "step_restore_cache");
 
-        const [roadsJSON, waterJSON, parksJSON, poisJSON] = await Promise.all([
-          decompress(cachedBlobs["roads"]!).then(JSON.parse),
-          decompress(cachedBlobs["water"]!).then(JSON.parse),
-          decompress(cachedBlobs["parks"]!).then(JSON.parse),
-          decompress(poisCachedBlob!).then(JSON.parse),
+        // 缓存中存的是已扁平化 (且 water 已合并海洋多边形) 的二进制，可直接返回
+        const [roadsBin, waterBin, parksBin, poisBin] = await Promise.all([
+          decompressBinary(cachedBlobs["roads"]!),
+          decompressBinary(cachedBlobs["water"]!),
+          decompressBinary(cachedBlobs["parks"]!),
+          decompressBinary(poisCachedBlob!),
         ]);
 
-        results.roads = flattenRoadsGeoJSON(roadsJSON) as any;
-        const mergedWaterJSON = mergeSeaPolygonsIntoWaterGeoJSON(waterJSON, {
-          centerLat: lat,
-          centerLng: lng,
-          baseRadiusMeters: baseRadius,
-          viewportBbox: fetchViewportBbox,
-        });
-        results.water = flattenPolygonsGeoJSON(mergedWaterJSON) as any;
-        results.parks = flattenPolygonsGeoJSON(parksJSON) as any;
-        results.pois = flattenPOIsGeometry(poisJSON) as any;
+        results.roads = roadsBin;
+        results.water = waterBin;
+        results.parks = parksBin;
+        results.pois = poisBin;
         results.fromCache = true;
       } else {
         let roadsGeo, waterGeo, parksGeo;
@@ -182,35 +230,55 @@ self.onmessage = async (event: MessageEvent) => {
           waterGeo = protomapsData.water;
           parksGeo = protomapsData.landuse;
         } else if (USE_OVERPASS_CLIENT) {
-          // [新库] 使用 overpass-client (串行请求，避免触发服务器并发限制)
+          // [新库] 使用 overpass-client
+          // 道路/水体/公园三个下载互相独立，并发发起；同时在途的 POST 数量由
+          // overpass-client 内部信号量 (overpassConfig.maxConcurrentRequests) 限制
           console.log(
-            `[DataWorker] Cache Miss: ${city}. Fetching from overpass-client (sequential) with LOD: ${lodMode}...`
+            `[DataWorker] Cache Miss: ${city}. Fetching from overpass-client (concurrent) with LOD: ${lodMode}...`
           );
 
-          // 步骤1: 获取道路 (overpass-client 内部会处理 API 槽位检查和倒计时)
-          sendProgress(5, "step_fetching_roads");
-          roadsGeo = await fetchGraphOverpass(
-            fetchViewportPolygon,
-            baseRadius,
-            lodMode,
-            createProgressCallback(5, "step_fetching_roads")
+          // 步骤1-3: 获取道路、水体、公园 (overpass-client 内部会处理 API 槽位检查和倒计时)
+          // 三个下载同时在途，共用一个合并的步骤文案；进度只随完成数单调增长，
+          // 不再沿用串行时各自的 5/15/25 基准，否则进度条会来回跳、文案在三层之间闪烁
+          let completedFetches = 0;
+          const fetchProgress = createConcurrentProgress(
+            3,
+            () => 5 + completedFetches * 10,
+            "step_fetching_data"
           );
+          const [roadsProgress, waterProgress, parksProgress] = fetchProgress.callbacks;
+          fetchProgress.report();
+          const trackFetch = <T>(task: Promise<T>) =>
+            task.then((result) => {
+              completedFetches++;
+              fetchProgress.report();
+              return result;
+            });
 
-          // 步骤2: 获取水体
-          sendProgress(15, "step_fetching_water");
-          waterGeo = await fetchFeaturesOverpass(
-            fetchViewportPolygon,
-            "water",
-            createProgressCallback(15, "step_fetching_water")
-          );
-
-          // 步骤3: 获取公园
-          sendProgress(25, "step_fetching_parks");
-          parksGeo = await fetchFeaturesOverpass(
-            fetchViewportPolygon,
-            "parks",
-            createProgressCallback(25, "step_fetching_parks")
-          );
+          [roadsGeo, waterGeo, parksGeo] = await Promise.all([
+            trackFetch(
+              fetchGraphOverpass(
+                fetchViewportPolygon,
+                baseRadius,
+                lodMode,
+                roadsProgress
+              )
+            ),
+            trackFetch(
+              fetchFeaturesOverpass(
+                fetchViewportPolygon,
+                "water",
+                waterProgress
+              )
+            ),
+            trackFetch(
+              fetchFeaturesOverpass(
+                fetchViewportPolygon,
+                "parks",
+                parksProgress
+              )
+            ),
+          ]);
 
           // 步骤4: 获取POI
           sendProgress(35, "step_fetching_pois");
@@ -223,13 +291,11 @@ self.onmessage = async (event: MessageEvent) => {
               createProgressCallback(40, "step_fetching_pois")
             );
             if (poisGeo) {
-              const compressed = await compress(JSON.stringify(poisGeo));
-              await db.put(STORE_NAME, compressed, poisCacheKey);
               results.pois = flattenPOIsGeometry(poisGeo) as any;
+              await db.put(STORE_NAME, await compressBinary(results.pois), poisCacheKey);
             }
           } else {
-            const poisJSON = await decompress(poisCachedBlob!).then(JSON.parse);
-            results.pois = flattenPOIsGeometry(poisJSON) as any;
+            results.pois = await decompressBinary(poisCachedBlob!);
           }
 
           sendProgress(60, "step_fetch_complete");
@@ -271,13 +337,11 @@ self.onmessage = async (event: MessageEvent) => {
           if (!poisCached) {
             const poisGeo = await fetchPOIs([lat, lng], fetchRadius);
             if (poisGeo) {
-              const compressed = await compress(JSON.stringify(poisGeo));
-              await db.put(STORE_NAME, compressed, poisCacheKey);
               results.pois = flattenPOIsGeometry(poisGeo) as any;
+              await db.put(STORE_NAME, await compressBinary(results.pois), poisCacheKey);
             }
           } else {
-            const poisJSON = await decompress(poisCachedBlob!).then(JSON.parse);
-            results.pois = flattenPOIsGeometry(poisJSON) as any;
+            results.pois = await decompressBinary(poisCachedBlob!);
           }
 
           sendProgress(60, "step_fetch_complete");
@@ -298,14 +362,14 @@ self.onmessage = async (event: MessageEvent) => {
         results.parks = flattenPolygonsGeoJSON(parksGeo) as any;
 
         // 异步存入库 (不包含 POI，因为已经同步存入)
+        // 存扁平化后的二进制而不是 GeoJSON：体积更小，命中时省去 JSON.parse + flatten
         const saveTasks = [
-          { type: "roads", data: roadsGeo },
-          { type: "water", data: waterGeo },
-          { type: "parks", data: parksGeo },
+          { type: "roads", data: results.roads },
+          { type: "water", data: results.water },
+          { type: "parks", data: results.parks },
         ].map(async ({ type: t, data }) => {
-          const json = JSON.stringify(data);
-          const compressed = await compress(json);
-          const key = createMapDataCacheKey(country, city, baseRadius, lodMode, t);
+          const compressed = await compressBinary(data);
+          const key = createMapDataCacheKey(lat, lng, baseRadius, lodMode, t);
           return db.put(STORE_NAME, compressed, key);
         });
         await Promise.all(saveTasks);
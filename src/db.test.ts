@@ -0,0 +1,26 @@
+import { describe, expect, it } from "bun:test";
+
+import { shuffleFloat64Bytes, unshuffleFloat64Bytes } from "./db";
+
+describe("float64 byte shuffle", () => {
+  it("round-trips flattened binaries unchanged", () => {
+    const data = new Float64Array([2, 5, 3, 110.1957, 20.0462, -0, Number.MAX_VALUE, 1e-300]);
+
+    const restored = unshuffleFloat64Bytes(shuffleFloat64Bytes(data));
+
+    expect(Array.from(restored)).toEqual(Array.from(data));
+    expect(Object.is(restored[5], -0)).toBe(true);
+  });
+
+  it("groups the same byte of every value together", () => {
+    const data = new Float64Array([1, 1]);
+    const raw = new Uint8Array(data.buffer);
+
+    const shuffled = shuffleFloat64Bytes(data);
+
+    for (let b = 0; b < 8; b++) {
+      expect(shuffled[b * 2]).toBe(raw[b]);
+      expect(shuffled[b * 2 + 1]).toBe(raw[8 + b]);
+    }
+  });
+});
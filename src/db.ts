@@ -15,19 +15,58 @@ export async function getDB(): Promise<IDBPDatabase> {
 }
 
 /**
- * 压缩数据
+ * 压缩扁平化后的二进制数据 (Float64Array)
+ *
+ * 直接缓存 flatten 之后的结果，命中时无需 JSON.parse 和再次 flatten。
+ * 压缩前先做字节重排 (byte shuffle)：同一城市的经纬度符号位/指数/高位尾数几乎相同，
+ * 把每个 float 的第 k 个字节放到一起后 gzip 能找到更长的重复串，缓存体积明显更小
  */
-export async function compress(data: string): Promise<Blob> {
-  const stream = new Blob([data]).stream();
+export async function compressBinary(data: Float64Array): Promise<Blob> {
+  const stream = new Blob([shuffleFloat64Bytes(data) as BufferSource]).stream();
   const compressedStream = stream.pipeThrough(new CompressionStream("gzip"));
   return new Response(compressedStream).blob();
 }
 
 /**
- * 解压数据
+ * 解压二进制数据，返回可直接 transfer 的 Float64Array
  */
-export async function decompress(blob: Blob): Promise<string> {
+export async function decompressBinary(blob: Blob): Promise<Float64Array> {
   const stream = blob.stream();
   const decompressedStream = stream.pipeThrough(new DecompressionStream("gzip"));
-  return new Response(decompressedStream).text();
+  const buffer = await new Response(decompressedStream).arrayBuffer();
+  return unshuffleFloat64Bytes(new Uint8Array(buffer));
+}
+
+const FLOAT64_BYTES = Float64Array.BYTES_PER_ELEMENT;
+
+/**
+ * 字节重排：[f0b0..f0b7, f1b0..f1b7, ...] → [f0b0, f1b0, ..., f0b1, f1b1, ...]
+ */
+export function shuffleFloat64Bytes(data: Float64Array): Uint8Array {
+  const bytes = new Uint8Array(data.buffer, data.byteOffset, data.byteLength);
+  const count = data.length;
+  const out = new Uint8Array(bytes.length);
+  for (let b = 0; b < FLOAT64_BYTES; b++) {
+    const plane = b * count;
+    for (let i = 0; i < count; i++) {
+      out[plane + i] = bytes[i * FLOAT64_BYTES + b];
+    }
+  }
+  return out;
+}
+
+/**
+ * shuffleFloat64Bytes 的逆操作
+ */
+export function unshuffleFloat64Bytes(shuffled: Uint8Array): Float64Array {
+  const count = Math.floor(shuffled.length / FLOAT64_BYTES);
+  const out = new Float64Array(count);
+  const bytes = new Uint8Array(out.buffer);
+  for (let b = 0; b < FLOAT64_BYTES; b++) {
+    const plane = b * count;
+    for (let i = 0; i < count; i++) {
+      bytes[i * FLOAT64_BYTES + b] = shuffled[plane + i];
+    }
+  }
+  return out;
 }
@@ -0,0 +1,87 @@
+import { describe, expect, it } from "bun:test";
+
+import { flattenPolygonsGeoJSON } from "./utils";
+
+describe("flattenPolygonsGeoJSON", () => {
+  it("expands a MultiPolygon into multiple polygons instead of keeping only the first one", () => {
+    const geojson: GeoJSON.FeatureCollection = {
+      type: "FeatureCollection",
+      features: [
+        {
+          type: "Feature",
+          properties: { natural: "water" },
+          geometry: {
+            type: "MultiPolygon",
+            coordinates: [
+              [
+                [
+                  [0, 0],
+                  [1, 0],
+                  [1, 1],
+                  [0, 0],
+                ],
+              ],
+              [
+                [
+                  [2, 2],
+                  [3, 2],
+                  [3, 3],
+                  [2, 2],
+                ],
+              ],
+            ],
+          },
+        } as GeoJSON.Feature,
+      ],
+    };
+
+    const flattened = flattenPolygonsGeoJSON(geojson);
+
+    expect(flattened[0]).toBe(2);
+    expect(Array.from(flattened.slice(1, 11))).toEqual([4, 0, 0, 0, 1, 0, 1, 1, 0, 0]);
+    expect(Array.from(flattened.slice(11, 21))).toEqual([4, 0, 2, 2, 3, 2, 3, 3, 2, 2]);
+    expect(flattened.length).toBe(21);
+  });
+
+  it("writes interior rings after the exterior ring", () => {
+    const geojson: GeoJSON.FeatureCollection = {
+      type: "FeatureCollection",
+      features: [
+        {
+          type: "Feature",
+          properties: {},
+          geometry: {
+            type: "Polygon",
+            coordinates: [
+              [
+                [0, 0],
+                [4, 0],
+                [4, 4],
+                [0, 0],
+              ],
+              [
+                [1, 1],
+                [2, 1],
+                [2, 2],
+                [1, 1],
+              ],
+            ],
+          },
+        } as GeoJSON.Feature,
+        {
+          type: "Feature",
+          properties: {},
+          geometry: { type: "Point", coordinates: [5, 5] },
+        } as GeoJSON.Feature,
+      ],
+    };
+
+    const flattened = flattenPolygonsGeoJSON(geojson);
+
+    expect(flattened[0]).toBe(1);
+    expect(flattened[1]).toBe(4); // 外环点数
+    expect(flattened[2]).toBe(1); // 洞的数量
+    expect(flattened[11]).toBe(4); // 洞的点数
+    expect(Array.from(flattened.slice(12))).toEqual([1, 1, 2, 1, 2, 2, 1, 1]);
+  });
+});
@@ -0,0 +1,32 @@
+import { describe, expect, it } from "bun:test";
+
+import { formatCityName, formatCoordinates } from "./poster-text";
+
+describe("formatCityName", () => {
+  // 与 wasm/src/utils.rs 的 test_format_city_name 保持一致
+  it("separates latin characters with single spaces without changing case", () => {
+    expect(formatCityName("PARIS")).toBe("P A R I S");
+    expect(formatCityName("Paris")).toBe("P a r i s");
+    expect(formatCityName("SÃO PAULO")).toBe("S Ã O   P A U L O");
+  });
+
+  it("keeps non-latin names unchanged", () => {
+    expect(formatCityName("东京")).toBe("东京");
+  });
+});
+
+describe("formatCoordinates", () => {
+  it("formats both hemispheres with four decimals", () => {
+    expect(formatCoordinates(48.8566, 2.3522)).toBe("48.8566° N / 2.3522° E");
+    expect(formatCoordinates(-33.8688, -70.6693)).toBe("33.8688° S / 70.6693° W");
+  });
+
+  it("does not mark a value that rounds to zero as south / west", () => {
+    expect(formatCoordinates(-0.00001, -0.00001)).toBe("0.0000° N / 0.0000° E");
+  });
+
+  it("takes the hemisphere from the formatted digits at exact half steps", () => {
+    // 与 wasm/src/utils.rs 的 test_format_coordinates 保持一致
+    expect(formatCoordinates(-0.00005, -0.00005)).toBe("0.0001° S / 0.0001° W");
+  });
+});
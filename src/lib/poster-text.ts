@@ -0,0 +1,43 @@
+// 海报文字格式化，需与 WASM 端 (wasm/src/utils.rs) 的输出逐字一致，保证预览与导出 PNG 相同
+
+const LETTER_REGEX = /\p{L}/u;
+
+// 与 WASM 端 is_latin_script 逻辑一致：字母中码点 < 0x250 的占比 > 80% 视为拉丁文
+function isLatinScript(text: string): boolean {
+  let latinCount = 0,
+    totalAlpha = 0;
+  for (const char of text) {
+    if (LETTER_REGEX.test(char)) {
+      totalAlpha++;
+      if (char.codePointAt(0)! < 0x250) latinCount++;
+    }
+  }
+  return totalAlpha === 0 || latinCount / totalAlpha > 0.8;
+}
+
+/**
+ * 格式化城市名：拉丁文在字符之间插入单个空格，非拉丁文保持原样
+ *
+ * 与 WASM 端 format_city_name 一致：按码点 (而非 UTF-16 单元) 拆分，不做大小写转换，
+ * 调用方传入的城市名已经大写
+ */
+export function formatCityName(city: string): string {
+  if (isLatinScript(city)) return Array.from(city).join(" ");
+  return city;
+}
+
+/**
+ * 格式化坐标显示，例如 "48.8566° N / 2.3522° E"
+ *
+ * 每个分量只格式化一次，半球按显示出来的数字判断：
+ * 舍入后为 0.0000 时不标 S / W；JS 的 Math.round(-0.5) 为 -0，
+ * 若另行按 Math.round 判断，-0.00005 会显示成 "0.0001° N"，与 WASM 端的 "S" 不一致。
+ * toFixed 与 locale 无关，小数点固定为 "."
+ */
+export function formatCoordinates(lat: number, lon: number): string {
+  const latStr = Math.abs(lat).toFixed(4);
+  const lonStr = Math.abs(lon).toFixed(4);
+  const latDir = lat < 0 && Number(latStr) !== 0 ? "S" : "N";
+  const lonDir = lon < 0 && Number(lonStr) !== 0 ? "W" : "E";
+  return `${latStr}° ${latDir} / ${lonStr}° ${lonDir}`;
+}
@@ -4,6 +4,7 @@ import {
   bboxToPolygon,
   buildCanonicalFetchRadiusMeters,
   buildCanonicalFetchViewportBbox,
+  buildMapDataLocationKey,
   buildRenderViewportBbox,
 } from "./poster-viewport";
 
@@ -63,4 +64,10 @@ describe("poster viewport helpers", () => {
   it("exposes a cache version prefix for canonical fetch viewport data", () => {
     expect(MAP_DATA_CACHE_VERSION).toContain("canonical-fetch-viewport");
   });
+
+  it("builds the same location cache key for nearly identical coordinates", () => {
+    expect(buildMapDataLocationKey(48.8566, 2.3522)).toBe("48.8566,2.3522");
+    expect(buildMapDataLocationKey(48.85660001, 2.35219999)).toBe("48.8566,2.3522");
+    expect(buildMapDataLocationKey(-0.00001, 0)).toBe("0.0000,0.0000");
+  });
 });
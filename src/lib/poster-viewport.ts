@@ -32,7 +32,24 @@ const MAX_SUPPORTED_INVERSE_ASPECT = Math.max(
   ...SUPPORTED_POSTER_DIMENSIONS.map(({ width, height }) => height / width)
 );
 
-export const MAP_DATA_CACHE_VERSION = "v7-canonical-fetch-viewport-deduped-overpass";
+export const MAP_DATA_CACHE_VERSION =
+  "v11-canonical-fetch-viewport-deduped-overpass-shuffled-binary-coord-key";
+
+// 4 位小数约 11 m，足以区分城市中心，同时吸收坐标来源之间的浮点误差
+const CACHE_COORD_DECIMALS = 4;
+
+/**
+ * 以中心坐标 (而非国家/城市名) 标识缓存的地理范围。
+ * 同名城市不会互相命中，浮点末位差异也不会导致缓存失效。
+ */
+export function buildMapDataLocationKey(centerLat: number, centerLng: number): string {
+  return `${roundCacheCoord(centerLat)},${roundCacheCoord(centerLng)}`;
+}
+
+function roundCacheCoord(value: number): string {
+  // + 0 把 -0 归一为 0，避免 "-0.0000" 与 "0.0000" 成为两个 key
+  return (Number(value.toFixed(CACHE_COORD_DECIMALS)) + 0).toFixed(CACHE_COORD_DECIMALS);
+}
 
 export function buildRenderViewportBbox({
   centerLat,
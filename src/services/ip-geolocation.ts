@@ -5,6 +5,11 @@
 
 const GEO_API_URL = "https://ip.0v0.one/";
 
+// Successful lookups are persisted so repeat visits skip the network round-trip.
+// An IP's location rarely changes within a day.
+const GEO_CACHE_KEY = "maptoposter_ip_geolocation";
+const GEO_CACHE_TTL_MS = 24 * 60 * 60 * 1000;
+
 export interface IpGeolocation {
   ip: string;
   country: string; // ISO2 code, e.g., "SG", "CN"
@@ -14,11 +19,57 @@ export interface IpGeolocation {
   latitude: number;
 }
 
+// Shared in-flight/settled request, so repeated callers (e.g. effects re-running
+// under StrictMode) reuse one connection and one response
+let geolocationPromise: Promise<IpGeolocation | null> | null = null;
+
 /**
  * Get user geolocation based on IP address
  * @returns Promise<IpGeolocation | null> - Returns null if request fails
  */
-export async function getUserGeolocation(): Promise<IpGeolocation | null> {
+export function getUserGeolocation(): Promise<IpGeolocation | null> {
+  if (!geolocationPromise) {
+    const cached = readCachedGeolocation();
+    if (cached) {
+      geolocationPromise = Promise.resolve(cached);
+      return geolocationPromise;
+    }
+
+    geolocationPromise = fetchUserGeolocation().then((geo) => {
+      // Don't pin a failure; let the next caller retry
+      if (!geo) geolocationPromise = null;
+      else writeCachedGeolocation(geo);
+      return geo;
+    });
+  }
+  return geolocationPromise;
+}
+
+function readCachedGeolocation(): IpGeolocation | null {
+  try {
+    const raw = localStorage.getItem(GEO_CACHE_KEY);
+    if (!raw) return null;
+    const { savedAt, geo } = JSON.parse(raw) as { savedAt: number; geo: IpGeolocation };
+    if (!geo || typeof savedAt !== "number" || Date.now() - savedAt > GEO_CACHE_TTL_MS) {
+      localStorage.removeItem(GEO_CACHE_KEY);
+      return null;
+    }
+    return geo;
+  } catch {
+    // Corrupt entry or storage unavailable (private mode); fall back to the network
+    return null;
+  }
+}
+
+function writeCachedGeolocation(geo: IpGeolocation) {
+  try {
+    localStorage.setItem(GEO_CACHE_KEY, JSON.stringify({ savedAt: Date.now(), geo }));
+  } catch {
+    // Quota exceeded or storage unavailable; caching is best-effort
+  }
+}
+
+async function fetchUserGeolocation(): Promise<IpGeolocation | null> {
   try {
     const response = await fetch(GEO_API_URL);
     if (!response.ok) {
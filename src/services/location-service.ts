@@ -4,6 +4,7 @@
  * Uses compressed field names: i(id), n(name), i2(iso2), c(countryCode), s(stateCode), la(latitude), lo(longitude), si(stateId)
  */
 
+import { getDB } from "@/db";
 import type { Country, State, City, LocationServiceState } from "./location-types";
 
 const CDN_BASE =
@@ -15,6 +16,10 @@ const DATA_URLS = {
   cities: (countryIso2: string) => `${CDN_BASE}/cities-${countryIso2.toLowerCase()}.json`,
 };
 
+const STORE_NAME = "geojson-cache";
+// CDN_BASE is pinned to a commit, so the parsed list can be kept until that pin changes
+const COUNTRIES_CACHE_KEY = `location_data:${CDN_BASE}:countries`;
+
 interface RawCountry {
   i: number;
   n: string;
@@ -44,7 +49,11 @@ export class LocationService {
 
   // Cache for lazy-loaded data
   private statesCache: Record<string, State[]> = {};
-  private citiesCache: Record<string, City[]> = {};
+  // Cities are fetched per country but always read per state, so group them once on load
+  private citiesCache: Record<string, Map<number, City[]>> = {};
+  // In-flight requests, so concurrent callers share one fetch + JSON parse per file
+  private statesLoading: Map<string, Promise<State[]>> = new Map();
+  private citiesLoading: Map<string, Promise<Map<number, City[]>>> = new Map();
   private countriesMap: Map<number, Country> = new Map();
   // New: Map stateId to countryIso2 for quick lookup
   private stateCountryMap: Map<number, string> = new Map();
@@ -82,10 +91,18 @@ export class LocationService {
    * Refresh data (clear cache and reload)
    */
   async refreshData(): Promise<LocationServiceState> {
+    try {
+      const db = await getDB();
+      await db.delete(STORE_NAME, COUNTRIES_CACHE_KEY);
+    } catch (err: unknown) {
+      console.warn("Failed to clear cached countries from IndexedDB:", err);
+    }
     this.memoryCache = null;
     this.loadingPromise = null;
     this.statesCache = {};
     this.citiesCache = {};
+    this.statesLoading = new Map();
+    this.citiesLoading = new Map();
     this.countriesMap = new Map();
     this.stateCountryMap = new Map();
     return this.loadData();
@@ -120,6 +137,18 @@ export class LocationService {
       return this.statesCache[iso2];
     }
 
+    let pending = this.statesLoading.get(iso2);
+    if (!pending) {
+      pending = this._fetchStates(iso2, countryId).finally(() => this.statesLoading.delete(iso2));
+      this.statesLoading.set(iso2, pending);
+    }
+    return pending;
+  }
+
+  /**
+   * Fetch and cache the states of one country
+   */
+  private async _fetchStates(iso2: string, countryId: number): Promise<State[]> {
     // Try to fetch from CDN
     try {
       const response = await fetch(DATA_URLS.states(iso2));
@@ -185,13 +214,29 @@ export class LocationService {
     }
 
     // Return from cities cache if available
-    if (this.citiesCache[targetCountryIso2]) {
-      return this.citiesCache[targetCountryIso2].filter((c) => c.state_id === stateId);
+    let citiesByState: Map<number, City[]> | undefined = this.citiesCache[targetCountryIso2];
+    if (!citiesByState) {
+      const iso2 = targetCountryIso2;
+      let pending = this.citiesLoading.get(iso2);
+      if (!pending) {
+        pending = this._fetchCities(iso2).finally(() => this.citiesLoading.delete(iso2));
+        this.citiesLoading.set(iso2, pending);
+      }
+      citiesByState = await pending;
     }
 
+    return citiesByState.get(stateId) ?? [];
+  }
+
+  /**
+   * Fetch the cities of one country and cache them grouped by state ID
+   */
+  private async _fetchCities(countryIso2: string): Promise<Map<number, City[]>> {
+    const citiesByState = new Map<number, City[]>();
+
     // Fetch cities for this country
     try {
-      const response = await fetch(DATA_URLS.cities(targetCountryIso2));
+      const response = await fetch(DATA_URLS.cities(countryIso2));
       if (response.ok) {
         const rawCities: RawCity[] = await response.json();
         const cities: City[] = rawCities.map((c) => ({
@@ -205,14 +250,19 @@ export class LocationService {
           stateCode: c.s,
         }));
 
-        this.citiesCache[targetCountryIso2] = cities;
-        return cities.filter((c) => c.state_id === stateId);
+        for (const city of cities) {
+          const stateCities = citiesByState.get(city.state_id);
+          if (stateCities) stateCities.push(city);
+          else citiesByState.set(city.state_id, [city]);
+        }
+
+        this.citiesCache[countryIso2] = citiesByState;
       }
     } catch (err: unknown) {
-      console.error(`Failed to load cities for ${targetCountryIso2}:`, err);
+      console.error(`Failed to load cities for ${countryIso2}:`, err);
     }
 
-    return [];
+    return citiesByState;
   }
 
   /**
@@ -239,23 +289,50 @@ export class LocationService {
     return cities.find((c) => c.name.toLowerCase() === cityName.toLowerCase());
   }
 
-  private async _fetchFromCDN(): Promise<LocationServiceState> {
+  /**
+   * Load the parsed countries list, preferring the IndexedDB copy over the CDN
+   *
+   * IndexedDB stores the already-mapped objects, so warm loads skip both the network
+   * round-trip and the JSON parse + field remapping.
+   */
+  private async _loadCountries(): Promise<Country[]> {
     try {
-      console.log("Fetching countries from CDN...");
-
-      const response = await fetch(DATA_URLS.countries);
-      if (!response.ok) {
-        throw new Error(`Failed to fetch countries: ${response.status}`);
+      const db = await getDB();
+      const cached: Country[] | undefined = await db.get(STORE_NAME, COUNTRIES_CACHE_KEY);
+      if (cached && cached.length > 0) {
+        console.log(`✓ Loaded ${cached.length} countries from IndexedDB`);
+        return cached;
       }
+    } catch (err: unknown) {
+      console.warn("Failed to read countries from IndexedDB:", err);
+    }
+
+    console.log("Fetching countries from CDN...");
 
-      const rawCountries: RawCountry[] = await response.json();
-      const countries: Country[] = rawCountries.map((c) => ({
-        id: c.i,
-        name: c.n,
-        iso2: c.i2,
-      }));
+    const response = await fetch(DATA_URLS.countries);
+    if (!response.ok) {
+      throw new Error(`Failed to fetch countries: ${response.status}`);
+    }
+
+    const rawCountries: RawCountry[] = await response.json();
+    const countries: Country[] = rawCountries.map((c) => ({
+      id: c.i,
+      name: c.n,
+      iso2: c.i2,
+    }));
+
+    console.log(`✓ Loaded ${countries.length} countries`);
+
+    getDB()
+      .then((db) => db.put(STORE_NAME, countries, COUNTRIES_CACHE_KEY))
+      .catch((err: unknown) => console.warn("Failed to cache countries in IndexedDB:", err));
 
-      console.log(`✓ Loaded ${countries.length} countries`);
+    return countries;
+  }
+
+  private async _fetchFromCDN(): Promise<LocationServiceState> {
+    try {
+      const countries = await this._loadCountries();
 
       // Build initial index structures
       const statesByCountry: Record<string, State[]> = {};
@@ -282,6 +359,8 @@ export class LocationService {
     this.loadingPromise = null;
     this.statesCache = {};
     this.citiesCache = {};
+    this.statesLoading = new Map();
+    this.citiesLoading = new Map();
     this.countriesMap = new Map();
     this.stateCountryMap = new Map();
   }
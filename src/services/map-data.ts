@@ -1,7 +1,7 @@
 /**
  * 地图数据服务：管理内存缓存并与 Data Worker 通信
  */
-import { MAP_DATA_CACHE_VERSION } from "@/lib/poster-viewport";
+import { MAP_DATA_CACHE_VERSION, buildMapDataLocationKey } from "@/lib/poster-viewport";
 
 export interface MapData {
   roads: Float64Array;
@@ -13,6 +13,17 @@ export interface MapData {
   isProtomaps?: boolean;
 }
 
+/**
+ * WASM 投影后的地图数据 (Web Mercator)，与主题和画幅无关，可跨多次导出复用
+ */
+export interface ProjectedMapData {
+  roadShards: Float64Array[];
+  water: Float64Array;
+  parks: Float64Array;
+  pois: Float64Array;
+  isProtomaps?: boolean;
+}
+
 export interface POIData {
   pois: Float64Array;
   fromCache: boolean;
@@ -22,36 +33,47 @@ export interface POIData {
 // 进度回调类型
 export type ProgressCallback = (progress: number, step: string) => void;
 
+// 已投影数据保留的条目数 (LRU)：切换主题/画幅只会命中最近的一两个位置，
+// 每个条目都是整份道路/水体/公园的 Float64Array 副本，不宜无限累积
+const PROJECTED_CACHE_MAX_ENTRIES = 2;
+
 class MapDataService {
   private memoryCache = new Map<string, MapData>();
+  private projectedCache = new Map<string, ProjectedMapData>();
   private worker: Worker | null = null;
   private pendingRequests = new Map<number, { resolve: Function; reject: Function }>();
   private requestId = 0;
   private progressCallback: ProgressCallback | null = null;
 
-  constructor() {
-    if (typeof window !== "undefined") {
-      this.worker = new Worker(new URL("../data-worker.ts", import.meta.url), { type: "module" });
-      this.worker.onmessage = (event) => {
-        const { id, success, payload, error, progress, step, type } = event.data;
-
-        // 处理进度消息
-        if (type === "PROGRESS" && this.progressCallback) {
-          this.progressCallback(progress, step);
-          return;
-        }
-
-        const pending = this.pendingRequests.get(id);
-        if (pending) {
-          this.pendingRequests.delete(id);
-          if (success) {
-            pending.resolve(payload);
-          } else {
-            pending.reject(new Error(error));
-          }
+  /**
+   * 按需创建 Data Worker
+   * Worker 会加载 osmtogeojson / turf / jsts 等较重的依赖，推迟到第一次请求数据时再创建，
+   * 避免拖慢首屏启动
+   */
+  private getWorker(): Worker | null {
+    if (this.worker || typeof window === "undefined") return this.worker;
+
+    this.worker = new Worker(new URL("../data-worker.ts", import.meta.url), { type: "module" });
+    this.worker.onmessage = (event) => {
+      const { id, success, payload, error, progress, step, type } = event.data;
+
+      // 处理进度消息
+      if (type === "PROGRESS" && this.progressCallback) {
+        this.progressCallback(progress, step);
+        return;
+      }
+
+      const pending = this.pendingRequests.get(id);
+      if (pending) {
+        this.pendingRequests.delete(id);
+        if (success) {
+          pending.resolve(payload);
+        } else {
+          pending.reject(new Error(error));
         }
-      };
-    }
+      }
+    };
+    return this.worker;
   }
 
   // 设置进度回调
@@ -67,7 +89,7 @@ class MapDataService {
     baseRadius: number,
     lodMode: "simplified" | "detailed" = "simplified"
   ): Promise<MapData> {
-    const cacheKey = `${MAP_DATA_CACHE_VERSION}:${country}:${city}:${baseRadius}:${lodMode}`;
+    const cacheKey = this.createMemoryCacheKey(lat, lng, baseRadius, lodMode);
 
     // 1. 尝试 L1 内存缓存
     if (this.memoryCache.has(cacheKey)) {
@@ -86,14 +108,15 @@ class MapDataService {
     }
 
     // 2. 向 Worker 请求数据 (Worker 会处理 L2 IndexedDB 和网络)
-    if (!this.worker) throw new Error("Data Worker not initialized");
+    const worker = this.getWorker();
+    if (!worker) throw new Error("Data Worker not initialized");
 
     const id = this.requestId++;
     const promise = new Promise<MapData>((resolve, reject) => {
       this.pendingRequests.set(id, { resolve, reject });
     });
 
-    this.worker.postMessage({
+    worker.postMessage({
       id,
       type: "GET_MAP_DATA",
       payload: { country, city, lat, lng, baseRadius, lodMode },
@@ -117,6 +140,73 @@ class MapDataService {
     return result;
   }
 
+  /**
+   * 读取已投影数据的内存缓存，未命中返回 null
+   * 命中时跳过 getMapData 和 Worker 投影，只需重新渲染 (例如切换主题或画幅)
+   */
+  getProjectedMapData(
+    lat: number,
+    lng: number,
+    baseRadius: number,
+    lodMode: "simplified" | "detailed"
+  ): ProjectedMapData | null {
+    const cacheKey = this.createMemoryCacheKey(lat, lng, baseRadius, lodMode);
+    const cached = this.projectedCache.get(cacheKey);
+    if (!cached) return null;
+    console.log(`[MapDataService] Projected Memory Hit: ${cacheKey}`);
+    // 重新插入，把命中的条目移到 LRU 队尾
+    this.projectedCache.delete(cacheKey);
+    this.projectedCache.set(cacheKey, cached);
+    // 同样返回副本，渲染时这些 Buffer 会被 transfer
+    return {
+      roadShards: cached.roadShards.map((shard) => shard.slice()),
+      water: cached.water.slice(),
+      parks: cached.parks.slice(),
+      pois: cached.pois.slice(),
+      isProtomaps: cached.isProtomaps,
+    };
+  }
+
+  /**
+   * 存入已投影数据 (存副本，调用方的 Buffer 之后仍可 transfer)
+   * 同一 key 的原始数据此后不会再被读取 (先查投影缓存)，从 L1 中移除，避免同一份数据在内存里存两遍；
+   * 投影条目被 LRU 淘汰后，再次请求会从 IndexedDB (L2) 恢复
+   */
+  setProjectedMapData(
+    lat: number,
+    lng: number,
+    baseRadius: number,
+    lodMode: "simplified" | "detailed",
+    data: ProjectedMapData
+  ) {
+    const cacheKey = this.createMemoryCacheKey(lat, lng, baseRadius, lodMode);
+    this.projectedCache.delete(cacheKey);
+    this.projectedCache.set(cacheKey, {
+      roadShards: data.roadShards.map((shard) => shard.slice()),
+      water: data.water.slice(),
+      parks: data.parks.slice(),
+      pois: data.pois.slice(),
+      isProtomaps: data.isProtomaps,
+    });
+    this.memoryCache.delete(cacheKey);
+
+    // Map 按插入顺序迭代，第一个 key 即最久未使用的条目
+    while (this.projectedCache.size > PROJECTED_CACHE_MAX_ENTRIES) {
+      const oldestKey = this.projectedCache.keys().next().value as string;
+      this.projectedCache.delete(oldestKey);
+    }
+  }
+
+  private createMemoryCacheKey(
+    lat: number,
+    lng: number,
+    baseRadius: number,
+    lodMode: "simplified" | "detailed"
+  ) {
+    const location = buildMapDataLocationKey(lat, lng);
+    return `${MAP_DATA_CACHE_VERSION}:${location}:${baseRadius}:${lodMode}`;
+  }
+
   // [已废弃] POI 已合并到 getMapData 中，此方法保留用于向后兼容
   async getPOIs(
     country: string,
@@ -54,6 +54,14 @@ export const overpassConfig = {
    */
   overpassRateLimit: true,
 
+  /**
+   * 同时在途的 Overpass POST 请求上限。
+   *
+   * 公共实例通常每个 IP 只分配 2 个槽位，多个下载 (roads/water/parks)
+   * 并发发起时由 overpassRequest 内部的信号量排队，避免超出槽位触发 429。
+   */
+  maxConcurrentRequests: 2,
+
   /**
    * HTTP User-Agent 头。Overpass 服务器会拒绝空 UA 或常见爬虫 UA 的请求。
    */
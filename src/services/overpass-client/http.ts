@@ -165,3 +165,39 @@ export function hostnameFromUrl(url: string): string {
     return url;
   }
 }
+
+// ─── 本地并发限制 ────────────────────────────────────────
+
+// 同一上下文内所有 Overpass POST 共用的排队信号量（overpassRequest 与 utils.ts 的旧请求函数），
+// 公共实例按 IP 分配槽位，两套请求各自计数会超出槽位触发 429。
+// 上限取自 overpassConfig.maxConcurrentRequests（运行时可调）
+let activeRequests = 0;
+const requestQueue: (() => void)[] = [];
+
+/**
+ * 占用一个请求槽位，已满时排队等待。必须与 releaseRequestSlot 成对调用。
+ */
+export function acquireRequestSlot(): Promise<void> {
+  return new Promise((resolve) => {
+    if (activeRequests < Math.max(1, overpassConfig.maxConcurrentRequests)) {
+      activeRequests++;
+      resolve();
+    } else {
+      requestQueue.push(() => {
+        activeRequests++;
+        resolve();
+      });
+    }
+  });
+}
+
+/**
+ * 释放一个请求槽位，唤醒队首的等待者。
+ */
+export function releaseRequestSlot(): void {
+  activeRequests--;
+  if (requestQueue.length > 0) {
+    const next = requestQueue.shift()!;
+    next();
+  }
+}
@@ -4,9 +4,14 @@ import type { Feature, Polygon } from "geojson";
 // 导入待测模块
 import { overpassConfig } from "./config";
 import { makeOverpassPolygonCoordStrs, polygonToOverpassCoordStr } from "./geo";
-import { OverpassResponseError, parseResponse } from "./http";
+import {
+  acquireRequestSlot,
+  OverpassResponseError,
+  parseResponse,
+  releaseRequestSlot,
+} from "./http";
 import { downloadWater } from "./presets";
-import { getOverpassPause, makeOverpassSettings } from "./overpass";
+import { getOverpassPause, makeOverpassSettings, raceForAvailableSlot } from "./overpass";
 import { getNetworkFilter } from "./presets";
 
 describe("Config Module", () => {
@@ -270,3 +275,50 @@ describe("Presets Module", () => {
     }
   });
 });
+
+describe("Request slots", () => {
+  it("queues requests beyond maxConcurrentRequests until a slot is released", async () => {
+    const originalMax = overpassConfig.maxConcurrentRequests;
+    overpassConfig.maxConcurrentRequests = 2;
+    try {
+      await acquireRequestSlot();
+      await acquireRequestSlot();
+
+      let thirdAcquired = false;
+      const third = acquireRequestSlot().then(() => {
+        thirdAcquired = true;
+      });
+      await Promise.resolve();
+      expect(thirdAcquired).toBe(false);
+
+      releaseRequestSlot();
+      await third;
+      expect(thirdAcquired).toBe(true);
+
+      releaseRequestSlot();
+      releaseRequestSlot();
+    } finally {
+      overpassConfig.maxConcurrentRequests = originalMax;
+    }
+  });
+});
+
+describe("Server race", () => {
+  it("reports the free slot count of the winning server", async () => {
+    const originalFetch = globalThis.fetch;
+    try {
+      globalThis.fetch = (async (input: RequestInfo | URL) => {
+        const url = String(input);
+        const text = url.startsWith("https://a.example")
+          ? "Connected as: 1\nCurrent time: 2026-03-25T00:00:00Z\nRate limit: 2\n1 slots available now.\n"
+          : "Connected as: 1\nCurrent time: 2026-03-25T00:00:00Z\nRate limit: 2\nSlot available after: 2026-03-25T00:00:30Z, in 30 seconds.\n";
+        return new Response(text, { status: 200 });
+      }) as typeof fetch;
+
+      const winner = await raceForAvailableSlot(["https://a.example/api", "https://b.example/api"]);
+      expect(winner).toEqual({ url: "https://a.example/api", pauseMs: 0, slots: 1 });
+    } finally {
+      globalThis.fetch = originalFetch;
+    }
+  });
+});
@@ -9,11 +9,13 @@
 
 import { overpassConfig, OVERPASS_RACE_ENABLED, OVERPASS_RACE_SERVERS } from "./config";
 import {
+  acquireRequestSlot,
   buildHeaders,
   hostnameFromUrl,
   log,
   OverpassResponseError,
   parseResponse,
+  releaseRequestSlot,
   sleep,
 } from "./http";
 
@@ -192,6 +194,13 @@ export async function getOverpassPause(
 // 官方 Overpass API 地址（优先使用）
 const OFFICIAL_OVERPASS_URL = "https://overpass-api.de/api";
 
+/** race 的胜出结果：服务器地址、POST 前需等待的毫秒数、/status 报告的空闲槽位数 */
+export interface RaceWinner {
+  url: string;
+  pauseMs: number;
+  slots: number;
+}
+
 /**
  * 【Race 功能】并发查询多个服务器的 /status，返回最快"有可用槽位"的服务器
  *
@@ -206,11 +215,9 @@ const OFFICIAL_OVERPASS_URL = "https://overpass-api.de/api";
  * - 每个请求有 3 秒超时
  *
  * @param servers        服务器 URL 列表
- * @returns              { url: 获胜服务器URL, pauseMs: 需要等待的毫秒数 }
+ * @returns              { url: 获胜服务器URL, pauseMs: 需要等待的毫秒数, slots: 报告的空闲槽位数 }
  */
-export async function raceForAvailableSlot(
-  servers: string[]
-): Promise<{ url: string; pauseMs: number }> {
+export async function raceForAvailableSlot(servers: string[]): Promise<RaceWinner> {
   const STATUS_TIMEOUT_MS = 3000; // 3 秒超时
 
   // 步骤1：构造所有服务器的 /status 请求 Promise（不重试，只请求一次）
@@ -227,16 +234,16 @@ export async function raceForAvailableSlot(
       clearTimeout(timeout);
 
       if (!response.ok) {
-        return { url: baseUrl, pauseMs: Infinity, succeeded: false };
+        return { url: baseUrl, pauseMs: Infinity, slots: 0, succeeded: false };
       }
 
       const responseText = await response.text();
-      const pauseMs = parseStatusOnce(responseText); // 不重试的解析
+      const { pauseMs, slots } = parseStatusOnce(responseText); // 不重试的解析
 
-      return { url: baseUrl, pauseMs, succeeded: true };
+      return { url: baseUrl, pauseMs, slots, succeeded: true };
     } catch (e) {
       clearTimeout(timeout);
-      return { url: baseUrl, pauseMs: Infinity, succeeded: false, error: e };
+      return { url: baseUrl, pauseMs: Infinity, slots: 0, succeeded: false, error: e };
     }
   });
 
@@ -252,7 +259,8 @@ export async function raceForAvailableSlot(
       "warn",
       `[Overpass Race] All servers failed, falling back to official: ${OFFICIAL_OVERPASS_URL}`
     );
-    return { url: OFFICIAL_OVERPASS_URL, pauseMs: 0 };
+    // 槽位数未知，重新 race 也只会得到同样的结果，因此不限制共享的调用方数量
+    return { url: OFFICIAL_OVERPASS_URL, pauseMs: 0, slots: Infinity };
   }
 
   // 步骤4：分类
@@ -260,13 +268,13 @@ export async function raceForAvailableSlot(
   const withSlots = succeeded.filter((r) => r.pauseMs === 0);
   const waiting = succeeded.filter((r) => r.pauseMs > 0).sort((a, b) => a.pauseMs - b.pauseMs);
 
-  let winner: { url: string; pauseMs: number };
+  let winner: RaceWinner;
 
   if (withSlots.length > 0) {
     // 多个有槽？优先官方接口
     const officialWinner = withSlots.find((r) => r.url === OFFICIAL_OVERPASS_URL);
     winner = officialWinner || withSlots[0];
-    log("info", `[Overpass Race] Winner (has slots): ${winner.url} (pauseMs=${winner.pauseMs})`);
+    log("info", `[Overpass Race] Winner (has slots): ${winner.url} (slots=${winner.slots})`);
   } else {
     // 没有有槽的，选等待时间最短的
     winner = waiting[0];
@@ -276,16 +284,52 @@ export async function raceForAvailableSlot(
     );
   }
 
-  return { url: winner.url, pauseMs: winner.pauseMs };
+  return { url: winner.url, pauseMs: winner.pauseMs, slots: winner.slots };
+}
+
+// 正在进行中的 race 及已加入的调用方数量。roads/water/parks 会在同一时刻并发发起请求，
+// 共享这一次 /status 探测，不必各自并发探测全部服务器。
+// race 一结束就清空、不跨时间复用：胜出服务器的空闲槽位可能已被先拿到结果的请求占用
+let inFlightRace: { result: Promise<RaceWinner>; joined: number } | null = null;
+
+/**
+ * 【Race 功能】合并同时在途的 raceForAvailableSlot 调用
+ *
+ * - race 进行期间发起的调用按加入顺序共享结果，但最多只有胜出服务器报告的空闲槽位数个调用方
+ *   (需要等待的结果没有空闲槽位，按 1 个计)；其余调用方重新 race，
+ *   避免多个请求挤到同一个只剩 1 个槽位的镜像上排队或触发 429
+ * - race 结束后的调用重新发起一次 race
+ */
+async function getRaceWinner(servers: string[]): Promise<RaceWinner> {
+  let race = inFlightRace;
+  if (!race) {
+    const entry = { result: raceForAvailableSlot(servers), joined: 0 };
+    const clear = () => {
+      if (inFlightRace === entry) inFlightRace = null;
+    };
+    entry.result.then(clear, clear);
+    inFlightRace = entry;
+    race = entry;
+  }
+
+  const position = race.joined++;
+  const winner = await race.result;
+  if (position < Math.max(1, winner.slots)) return winner;
+
+  log(
+    "info",
+    `[Race] ${winner.url} reported ${winner.slots} free slot(s), re-racing for caller #${position + 1}`
+  );
+  return getRaceWinner(servers);
 }
 
 /**
  * 解析 /status 响应文本（单次，不重试）
  *
  * @param responseText /status 返回的纯文本
- * @returns pauseMs: 0 表示有槽可用，>0 表示需要等待的毫秒数
+ * @returns pauseMs: 0 表示有槽可用，>0 表示需要等待的毫秒数；slots: 空闲槽位数（需等待时为 0）
  */
-function parseStatusOnce(responseText: string): number {
+function parseStatusOnce(responseText: string): { pauseMs: number; slots: number } {
   try {
     const lines = responseText.split("\n");
     let statusLine = "";
@@ -306,7 +350,7 @@ function parseStatusOnce(responseText: string): number {
     }
 
     if (!statusLine) {
-      return Infinity;
+      return { pauseMs: Infinity, slots: 0 };
     }
 
     const firstToken = statusLine.split(" ")[0];
@@ -314,23 +358,23 @@ function parseStatusOnce(responseText: string): number {
     // 有槽可用
     const slotCount = parseInt(firstToken, 10);
     if (!isNaN(slotCount) && slotCount >= 1) {
-      return 0;
+      return { pauseMs: 0, slots: slotCount };
     }
 
     // 需要等待到指定时间
     if (firstToken === "Slot") {
       const match = statusLine.match(/in\s+(\d+)\s+seconds/);
       if (match) {
-        return Math.max(parseInt(match[1], 10) * 1000, 1000);
+        return { pauseMs: Math.max(parseInt(match[1], 10) * 1000, 1000), slots: 0 };
       }
-      return Infinity;
+      return { pauseMs: Infinity, slots: 0 };
     }
 
     // 正在运行/无明确信息
-    return Infinity;
+    return { pauseMs: Infinity, slots: 0 };
   } catch (e) {
     log("error", `Failed to parse status response: ${e}`);
-    return Infinity;
+    return { pauseMs: Infinity, slots: 0 };
   }
 }
 
@@ -371,13 +415,18 @@ export async function overpassRequest(
   onProgress?: OverpassProgressCallback,
   preFetchedPauseMs?: number
 ): Promise<Record<string, unknown>> {
-  // 方案A（老逻辑）：关闭开关时，完全沿用原逻辑
-  if (!OVERPASS_RACE_ENABLED) {
-    return _overpassRequestInternal(query, maxRetries, 0, onProgress, preFetchedPauseMs);
-  }
+  await acquireRequestSlot();
+  try {
+    // 方案A（老逻辑）：关闭开关时，完全沿用原逻辑
+    if (!OVERPASS_RACE_ENABLED) {
+      return await _overpassRequestInternal(query, maxRetries, 0, onProgress, preFetchedPauseMs);
+    }
 
-  // 方案B（新逻辑）：多服务器 race
-  return _overpassRequestWithRace(query, maxRetries, 0, onProgress, preFetchedPauseMs);
+    // 方案B（新逻辑）：多服务器 race
+    return await _overpassRequestWithRace(query, maxRetries, 0, onProgress, preFetchedPauseMs);
+  } finally {
+    releaseRequestSlot();
+  }
 }
 
 async function _overpassRequestInternal(
@@ -539,7 +588,7 @@ async function _overpassRequestWithRace(
   } else {
     // 【核心新逻辑】race 多服务器找可用槽
     log("info", `[Race] Racing ${servers.length} servers for available slot...`);
-    const result = await raceForAvailableSlot(servers);
+    const result = await getRaceWinner(servers);
     pauseMs = result.pauseMs;
     selectedServer = result.url;
     log("info", `[Race] Selected server: ${selectedServer}, pauseMs=${pauseMs}`);
@@ -76,9 +76,18 @@ export function deduplicateOverpassElements(elements: OSMElement[]): OSMElement[
 
 /**
  * 将 Overpass JSON 数组转换为 GeoJSON.FeatureCollection
+ *
+ * osmtogeojson 会把全部 OSM tags 和元信息 (id/meta/relations) 带进 properties，
+ * 后续只用到极少数字段，因此转换后只保留 keepProperties 中列出的属性
+ * (与 utils.ts 中 cleanGeoJSON 的做法一致)，减小内存占用与 flatten 前的数据量
+ *
  * @param results Overpass JSON 数组
+ * @param keepProperties 需要保留的属性名 (例如道路的 "highway")
  */
-function convertToGeoJSON(results: Record<string, unknown>[]): GeoJSON.FeatureCollection | null {
+function convertToGeoJSON(
+  results: Record<string, unknown>[],
+  keepProperties: readonly string[] = []
+): GeoJSON.FeatureCollection | null {
   if (!results || results.length === 0) {
     return null;
   }
@@ -98,7 +107,18 @@ function convertToGeoJSON(results: Record<string, unknown>[]): GeoJSON.FeatureCo
     typeof osmtogeojson
   >[0]) as GeoJSON.FeatureCollection;
 
-  return geojson;
+  const features: GeoJSON.Feature[] = [];
+  for (const feature of geojson.features) {
+    if (!feature.geometry) continue;
+    const properties: Record<string, unknown> = {};
+    for (const key of keepProperties) {
+      const value = feature.properties?.[key];
+      if (value !== undefined) properties[key] = value;
+    }
+    features.push({ type: "Feature", geometry: feature.geometry, properties });
+  }
+
+  return { type: "FeatureCollection", features };
 }
 
 /**
@@ -133,7 +153,7 @@ export async function fetchGraphOverpass(
 
   try {
     const results = await downloadRoads(region, networkType, onProgress, preFetchedPauseMs);
-    return convertToGeoJSON(results);
+    return convertToGeoJSON(results, ["highway"]);
   } catch (error) {
     log("error", `fetchGraphOverpass failed: ${error}`);
     return null;
@@ -178,7 +198,8 @@ export async function fetchFeaturesOverpass(
       results = await downloadParks(region, onProgress, preFetchedPauseMs);
     }
 
-    return convertToGeoJSON(results);
+    // water 保留 natural，用于识别 coastline 并合成海洋多边形 (sea-polygons.ts)
+    return convertToGeoJSON(results, type === "water" ? ["natural"] : []);
   } catch (error) {
     log("error", `fetchFeaturesOverpass (${type}) failed: ${error}`);
     return null;
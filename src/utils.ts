@@ -2,33 +2,8 @@ import type { Point } from "./types";
 import osmtogeojson from "osmtogeojson";
 import Pbf from "pbf";
 import { VectorTile, VectorTileLayer } from "@mapbox/vector-tile";
-
-// 全局并发限制，最多同时 2 个 Overpass 请求
-const MAX_CONCURRENT = 2;
-let activeRequests = 0;
-const requestQueue: (() => void)[] = [];
-
-function acquireSlot(): Promise<void> {
-  return new Promise((resolve) => {
-    if (activeRequests < MAX_CONCURRENT) {
-      activeRequests++;
-      resolve();
-    } else {
-      requestQueue.push(() => {
-        activeRequests++;
-        resolve();
-      });
-    }
-  });
-}
-
-function releaseSlot() {
-  activeRequests--;
-  if (requestQueue.length > 0) {
-    const next = requestQueue.shift()!;
-    next();
-  }
-}
+// 与 overpass-client 共用同一个并发信号量，两套请求合计不超过槽位上限
+import { acquireRequestSlot, releaseRequestSlot } from "./services/overpass-client/http";
 
 /**
  * 将经度转换为瓦片 X 坐标
@@ -354,109 +329,138 @@ function extractLayerFeatures(
  * 将道路 GeoJSON 扁平化为 Float64Array
  */
 export function flattenRoadsGeoJSON(geojson: GeoJSON.FeatureCollection): Float64Array {
-  const flattenedSegments: Array<{ type: number; coords: number[][] }> = [];
+  const features = geojson.features as any[];
 
-  for (const feature of geojson.features as any[]) {
-    const props = feature.properties || {};
-    const typeStr = Array.isArray(props.highway) ? props.highway[0] : props.highway;
-    const typeEnum = roadTypeToEnum(typeStr || "unclassified");
+  // 第一遍：只统计线段数与点数，不创建中间对象
+  let segmentCount = 0;
+  let totalPoints = 0;
+  for (const feature of features) {
     const geom = feature.geometry;
-
     if (!geom) continue;
-
     if (geom.type === "LineString") {
       if (geom.coordinates.length >= 2) {
-        flattenedSegments.push({ type: typeEnum, coords: geom.coordinates });
+        segmentCount++;
+        totalPoints += geom.coordinates.length;
       }
     } else if (geom.type === "MultiLineString") {
       for (const line of geom.coordinates) {
         if (line.length >= 2) {
-          flattenedSegments.push({ type: typeEnum, coords: line });
+          segmentCount++;
+          totalPoints += line.length;
         }
       }
     }
   }
 
-  const totalPoints = flattenedSegments.reduce((sum, segment) => sum + segment.coords.length, 0);
-  const buffer = new Float64Array(1 + flattenedSegments.length * 2 + totalPoints * 2);
+  // 第二遍：直接写入预分配的 Float64Array
+  const buffer = new Float64Array(1 + segmentCount * 2 + totalPoints * 2);
   let offset = 0;
-  buffer[offset++] = flattenedSegments.length;
-
-  for (const segment of flattenedSegments) {
-    buffer[offset++] = segment.type;
-    buffer[offset++] = segment.coords.length;
-    for (let i = 0; i < segment.coords.length; i++) {
-      buffer[offset++] = segment.coords[i][0];
-      buffer[offset++] = segment.coords[i][1];
+  buffer[offset++] = segmentCount;
+
+  const writeLine = (typeEnum: number, coords: number[][]) => {
+    buffer[offset++] = typeEnum;
+    buffer[offset++] = coords.length;
+    for (let i = 0; i < coords.length; i++) {
+      buffer[offset++] = coords[i][0];
+      buffer[offset++] = coords[i][1];
+    }
+  };
+
+  for (const feature of features) {
+    const geom = feature.geometry;
+    if (!geom) continue;
+
+    const props = feature.properties || {};
+    const typeStr = Array.isArray(props.highway) ? props.highway[0] : props.highway;
+    const typeEnum = roadTypeToEnum(typeStr || "unclassified");
+
+    if (geom.type === "LineString") {
+      if (geom.coordinates.length >= 2) {
+        writeLine(typeEnum, geom.coordinates);
+      }
+    } else if (geom.type === "MultiLineString") {
+      for (const line of geom.coordinates) {
+        if (line.length >= 2) {
+          writeLine(typeEnum, line);
+        }
+      }
     }
   }
   return buffer;
 }
 
+// highway → 道路类型枚举，与 Rust 端 RoadType::from_highway 保持一致
+// Motorway=0, Primary=1, Secondary=2, Tertiary=3, Residential=4, 其他=5
+const HIGHWAY_TYPE_ENUM = new Map<string, number>([
+  ["motorway", 0],
+  ["motorway_link", 0],
+  ["trunk", 1],
+  ["trunk_link", 1],
+  ["primary", 1],
+  ["primary_link", 1],
+  ["secondary", 2],
+  ["secondary_link", 2],
+  ["tertiary", 3],
+  ["tertiary_link", 3],
+  ["residential", 4],
+  ["living_street", 4],
+  ["unclassified", 4],
+]);
+
 function roadTypeToEnum(highway: string): number {
-  switch (highway) {
-    case "motorway":
-    case "motorway_link":
-      return 0;
-    case "trunk":
-    case "trunk_link":
-    case "primary":
-    case "primary_link":
-      return 1;
-    case "secondary":
-    case "secondary_link":
-      return 2;
-    case "tertiary":
-    case "tertiary_link":
-      return 3;
-    case "residential":
-    case "living_street":
-    case "unclassified":
-      return 4;
-    default:
-      return 5;
-  }
+  return HIGHWAY_TYPE_ENUM.get(highway) ?? 5;
 }
 
 /**
  * 将多边形 GeoJSON 扁平化为 Float64Array
+ *
+ * MultiPolygon 会被拆成多个独立多边形 (与 flattenRoadsGeoJSON 拆 MultiLineString 一致)，
+ * 先统计总长度再一次性写入预分配的 Float64Array，避免逐坐标 push 到普通数组
  */
 export function flattenPolygonsGeoJSON(geojson: GeoJSON.FeatureCollection): Float64Array {
-  const features = geojson.features.filter(
-    (f) => f.geometry.type === "Polygon" || f.geometry.type === "MultiPolygon"
-  );
-
-  // 使用数组暂存，最后统一转 Float64Array（多边形结构较复杂，预计算长度较难）
-  const result: number[] = [features.length];
-  for (const f of features) {
+  const polygons: number[][][][] = [];
+  for (const f of geojson.features) {
     const geom = f.geometry as any;
+    if (!geom) continue;
     if (geom.type === "Polygon") {
-      addPolygonToData(result, geom.coordinates);
+      polygons.push(geom.coordinates);
     } else if (geom.type === "MultiPolygon") {
-      if (geom.coordinates.length > 0) {
-        addPolygonToData(result, geom.coordinates[0]);
+      for (const rings of geom.coordinates) {
+        polygons.push(rings);
       }
     }
   }
-  return new Float64Array(result);
-}
 
-function addPolygonToData(data: number[], rings: number[][][]) {
-  const exterior = rings[0] || [];
-  data.push(exterior.length);
-  data.push(rings.length - 1); // 洞的数量
-  for (let i = 0; i < exterior.length; i++) {
-    data.push(exterior[i][0]);
-    data.push(exterior[i][1]);
+  // 每个多边形: [ext_n, n_holes, ext xy..., (ring_n, ring xy...)...]
+  let totalLength = 1;
+  for (const rings of polygons) {
+    totalLength += 2 + (rings[0]?.length ?? 0) * 2;
+    for (let i = 1; i < rings.length; i++) {
+      totalLength += 1 + rings[i].length * 2;
+    }
   }
-  for (let i = 1; i < rings.length; i++) {
-    const ring = rings[i];
-    data.push(ring.length);
-    for (let j = 0; j < ring.length; j++) {
-      data.push(ring[j][0]);
-      data.push(ring[j][1]);
+
+  const buffer = new Float64Array(totalLength);
+  let offset = 0;
+  buffer[offset++] = polygons.length;
+  for (const rings of polygons) {
+    const exterior = rings[0] || [];
+    buffer[offset++] = exterior.length;
+    buffer[offset++] = Math.max(rings.length - 1, 0); // 洞的数量
+    for (let i = 0; i < exterior.length; i++) {
+      buffer[offset++] = exterior[i][0];
+      buffer[offset++] = exterior[i][1];
+    }
+    for (let i = 1; i < rings.length; i++) {
+      const ring = rings[i];
+      buffer[offset++] = ring.length;
+      for (let j = 0; j < ring.length; j++) {
+        buffer[offset++] = ring[j][0];
+        buffer[offset++] = ring[j][1];
+      }
     }
   }
+  return buffer;
 }
 
 /**
@@ -512,7 +516,7 @@ async function fetchWithRetry(
   serverIndex = currentServerIndex,
   serverRetries?: number
 ): Promise<Response> {
-  await acquireSlot();
+  await acquireRequestSlot();
 
   const server = OVERPASS_SERVERS[serverIndex % OVERPASS_SERVERS.length];
   const retries = serverRetries ?? server.retries;
@@ -529,10 +533,10 @@ async function fetchWithRetry(
     if (!response.ok) throw new Error(`HTTP ${response.status}`);
 
     currentServerIndex = (serverIndex + 1) % OVERPASS_SERVERS.length;
-    releaseSlot(); // 成功释放
+    releaseRequestSlot(); // 成功释放
     return response;
   } catch (e) {
-    releaseSlot(); // 失败也释放，再决定是否重试
+    releaseRequestSlot(); // 失败也释放，再决定是否重试
     console.warn(`[Overpass] ${server.url} failed: ${e}, retries left: ${retries - 1}`);
 
     if (retries > 1) {
@@ -26,9 +26,6 @@ self.onmessage = async (event: MessageEvent) => {
       result = process_roads_bin_wasm(data as Float64Array);
     } else if (type === "polygons") {
       result = process_polygons_bin_wasm(data as Float64Array);
-    } else if (type === "pois") {
-      // POI 数据已经是最简形式 [poi_count, x1, y1, x2, y2, ...], 直接返回
-      result = data as Float64Array;
     } else if (type === "render") {
       const { roads_shards, water_bin, parks_bin, config_json, custom_font } = data as any;
 
@@ -45,10 +42,15 @@ self.onmessage = async (event: MessageEvent) => {
         renderResult = render_map_binary(roads_shards, water_bin, parks_bin, config_json);
       }
 
-      if (renderResult.is_success()) {
-        result = renderResult.get_data(); // 返回 Uint8Array
-      } else {
-        throw new Error(renderResult.get_error());
+      try {
+        if (renderResult.is_success()) {
+          result = renderResult.get_data(); // 返回 Uint8Array
+        } else {
+          throw new Error(renderResult.get_error());
+        }
+      } finally {
+        // PNG 已拷贝到 JS，立即释放 WASM 侧的整张图，不必等 GC 回收包装对象
+        renderResult.free();
       }
     } else {
       throw new Error(`Unknown task type: ${type}`);
@@ -68,6 +70,8 @@ self.onmessage = async (event: MessageEvent) => {
       id,
       success: false,
       error: String(error),
+      // WASM panic (panic = "abort") 在 JS 侧表现为 RuntimeError，此后该实例不可再用
+      panicked: error instanceof WebAssembly.RuntimeError,
     });
   }
 };
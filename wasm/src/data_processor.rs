@@ -1,4 +1,4 @@
-use crate::projection::project_points;
+use crate::projection::{project_flat_points_mut, project_points};
 use crate::types::{PolyFeature, Road, RoadType};
 use crate::utils::{time, time_end};
 use serde::Deserialize;
@@ -163,6 +163,98 @@ pub fn parse_polygons_bin(data: &[f64]) -> Result<Vec<PolyFeature>, String> {
     Ok(polys)
 }
 
+/// 原地投影道路二进制
+///
+/// 投影不改变二进制布局，只需把每段坐标替换为 Web Mercator，
+/// 无需先解析成 Vec<Road> 再重新拼装。数据不完整时截断到最后一条完整道路。
+/// 与 parse_roads_bin 一致，道路类型经 RoadType::from_u32 归一化（未知类型按 Default 绘制）。
+pub fn project_roads_bin_mut(data: &mut Vec<f64>) {
+    if data.is_empty() {
+        return;
+    }
+
+    let road_count = data[0] as usize;
+    let mut offset = 1;
+    let mut parsed = 0;
+
+    while parsed < road_count {
+        if offset + 2 > data.len() {
+            break;
+        }
+        let point_count = data[offset + 1] as usize;
+        let end = offset + 2 + point_count * 2;
+        if end > data.len() {
+            break;
+        }
+        data[offset] = RoadType::from_u32(data[offset] as u32).to_u32() as f64;
+        project_flat_points_mut(&mut data[offset + 2..end]);
+        offset = end;
+        parsed += 1;
+    }
+
+    data.truncate(offset);
+    data[0] = parsed as f64;
+}
+
+/// 原地投影多边形二进制，语义同 project_roads_bin_mut
+///
+/// 与 parse_polygons_bin 一致：外环完整而某个洞被截断时，保留该多边形及已完整的洞
+/// （回写洞数量），其后的数据全部丢弃。
+pub fn project_polygons_bin_mut(data: &mut Vec<f64>) {
+    if data.is_empty() {
+        return;
+    }
+
+    let poly_count = data[0] as usize;
+    let mut offset = 1;
+    let mut parsed = 0;
+
+    'polys: while parsed < poly_count {
+        if offset + 2 > data.len() {
+            break;
+        }
+        let exterior_count = data[offset] as usize;
+        let interior_ring_count = data[offset + 1] as usize;
+        let mut end = offset + 2 + exterior_count * 2;
+        if end > data.len() {
+            break;
+        }
+        let mut ring_ranges = Vec::with_capacity(1 + interior_ring_count);
+        ring_ranges.push(offset + 2..end);
+
+        let mut truncated = false;
+        for _ in 0..interior_ring_count {
+            if end + 1 > data.len() {
+                truncated = true;
+                break;
+            }
+            let ring_point_count = data[end] as usize;
+            let ring_end = end + 1 + ring_point_count * 2;
+            if ring_end > data.len() {
+                truncated = true;
+                break;
+            }
+            ring_ranges.push(end + 1..ring_end);
+            end = ring_end;
+        }
+
+        if truncated {
+            data[offset + 1] = (ring_ranges.len() - 1) as f64;
+        }
+        for range in ring_ranges {
+            project_flat_points_mut(&mut data[range]);
+        }
+        offset = end;
+        parsed += 1;
+        if truncated {
+            break 'polys;
+        }
+    }
+
+    data.truncate(offset);
+    data[0] = parsed as f64;
+}
+
 fn parse_coords_val(val: &serde_json::Value) -> Option<Vec<(f64, f64)>> {
     let arr = val.as_array()?;
     let mut coords = Vec::with_capacity(arr.len());
@@ -212,3 +304,79 @@ pub fn parse_roads(_: &str) -> Result<Vec<Road>, String> {
 pub fn parse_polygons(_: &str) -> Result<Vec<PolyFeature>, String> {
     Ok(vec![])
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    /// 把 parse_roads_bin 的结果按二进制布局重新拼装，用作原地投影的对照
+    fn roads_to_bin(roads: &[Road]) -> Vec<f64> {
+        let mut out = vec![roads.len() as f64];
+        for road in roads {
+            out.push(road.road_type.to_u32() as f64);
+            out.push(road.coords.len() as f64);
+            for (x, y) in &road.coords {
+                out.push(*x);
+                out.push(*y);
+            }
+        }
+        out
+    }
+
+    fn polygons_to_bin(polys: &[PolyFeature]) -> Vec<f64> {
+        let mut out = vec![polys.len() as f64];
+        for poly in polys {
+            out.push(poly.exterior.len() as f64);
+            out.push(poly.interiors.len() as f64);
+            for (x, y) in &poly.exterior {
+                out.push(*x);
+                out.push(*y);
+            }
+            for ring in &poly.interiors {
+                out.push(ring.len() as f64);
+                for (x, y) in ring {
+                    out.push(*x);
+                    out.push(*y);
+                }
+            }
+        }
+        out
+    }
+
+    #[test]
+    fn test_project_roads_bin_mut_normalizes_unknown_types() {
+        // 类型 9 不在 0-5 范围内，应按 Default (5) 保留而不是在绘制时被丢弃
+        let data = vec![2.0, 9.0, 2.0, 0.0, 0.0, 1.0, 1.0, 1.0, 1.0, 2.0, 2.0];
+        let mut projected = data.clone();
+        project_roads_bin_mut(&mut projected);
+
+        assert_eq!(projected[1], 5.0);
+        assert_eq!(projected, roads_to_bin(&parse_roads_bin(&data).unwrap()));
+    }
+
+    #[test]
+    fn test_project_roads_bin_mut_truncates_incomplete_road() {
+        let data = vec![2.0, 0.0, 1.0, 10.0, 20.0, 1.0, 3.0, 0.0];
+        let mut projected = data.clone();
+        project_roads_bin_mut(&mut projected);
+
+        assert_eq!(projected[0], 1.0);
+        assert_eq!(projected, roads_to_bin(&parse_roads_bin(&data).unwrap()));
+    }
+
+    #[test]
+    fn test_project_polygons_bin_mut_keeps_polygon_with_truncated_hole() {
+        // 外环 3 点、声明 2 个洞：第 1 个洞完整，第 2 个洞点数不足
+        let data = vec![
+            1.0, 3.0, 2.0, 0.0, 0.0, 4.0, 0.0, 4.0, 4.0, // 外环
+            3.0, 1.0, 1.0, 2.0, 1.0, 2.0, 2.0, // 洞 1
+            3.0, 1.5, 1.5, // 洞 2（截断）
+        ];
+        let mut projected = data.clone();
+        project_polygons_bin_mut(&mut projected);
+
+        assert_eq!(projected[0], 1.0);
+        assert_eq!(projected[2], 1.0);
+        assert_eq!(projected, polygons_to_bin(&parse_polygons_bin(&data).unwrap()));
+    }
+}
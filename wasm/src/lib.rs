@@ -161,7 +161,7 @@ fn render_map_binary_internal(
     config_json: &str,
     font_data: &[u8],
 ) -> RenderResult {
-    let config: BinaryRenderConfig = match serde_json::from_str(config_json) {
+    let mut config: BinaryRenderConfig = match serde_json::from_str(config_json) {
         Ok(c) => c,
         Err(e) => return RenderResult::error(format!("Config JSON parse failed: {}", e)),
     };
@@ -192,58 +192,32 @@ fn render_map_binary_internal(
         .map(|p| if p.is_empty() { 0 } else { p[0] as usize })
         .unwrap_or(0);
 
+    // 只从 JS 拷贝一次分片数据，统计与绘制共用
+    let shards: Vec<Vec<f64>> = if js_sys::Array::is_array(&roads_shards) {
+        js_sys::Array::from(&roads_shards)
+            .iter()
+            .filter_map(|v| v.dyn_ref::<js_sys::Float64Array>().map(|t| t.to_vec()))
+            .collect()
+    } else if let Some(shard_typed) = roads_shards.dyn_ref::<js_sys::Float64Array>() {
+        vec![shard_typed.to_vec()]
+    } else {
+        Vec::new()
+    };
+
     let mut total_roads = 0usize;
     let mut road_type_counts = [0usize; 6];
-
-    if js_sys::Array::is_array(&roads_shards) {
-        let shards_array = js_sys::Array::from(&roads_shards);
-        for shard_val in shards_array.iter() {
-            if let Some(shard_typed) = shard_val.dyn_ref::<js_sys::Float64Array>() {
-                let vec = shard_typed.to_vec();
-                if !vec.is_empty() {
-                    let road_count = vec[0] as usize;
-                    total_roads += road_count;
-
-                    let mut offset = 1;
-                    for _ in 0..road_count {
-                        if offset + 2 <= vec.len() {
-                            let type_val = vec[offset] as usize;
-                            let point_count = vec[offset + 1] as usize;
-                            if type_val < 6 {
-                                road_type_counts[type_val] += 1;
-                            }
-                            offset += 2 + point_count * 2;
-                        }
-                    }
-                }
-            }
-        }
-    } else if let Some(shard_typed) = roads_shards.dyn_ref::<js_sys::Float64Array>() {
-        let vec = shard_typed.to_vec();
-        if !vec.is_empty() {
-            let road_count = vec[0] as usize;
-            total_roads = road_count;
-
-            let mut offset = 1;
-            for _ in 0..road_count {
-                if offset + 2 <= vec.len() {
-                    let type_val = vec[offset] as usize;
-                    let point_count = vec[offset + 1] as usize;
-                    if type_val < 6 {
-                        road_type_counts[type_val] += 1;
-                    }
-                    offset += 2 + point_count * 2;
-                }
-            }
-        }
+    for shard in &shards {
+        total_roads += count_roads_by_type(shard, &mut road_type_counts);
     }
 
+    // 【优化】多行统计合并为一次 console.log，减少跨 JS/WASM 边界的调用次数
     log(&format!(
-        "[Render] Elements: {} roads, {} water polygons, {} parks, {} POIs",
-        total_roads, water_count, parks_count, poi_count
-    ));
-    log(&format!(
-        "[Render] Roads by type: Motorway={}, Primary={}, Secondary={}, Tertiary={}, Residential={}, Default={}",
+        "[Render] Elements: {} roads, {} water polygons, {} parks, {} POIs\n\
+         [Render] Roads by type: Motorway={}, Primary={}, Secondary={}, Tertiary={}, Residential={}, Default={}",
+        total_roads,
+        water_count,
+        parks_count,
+        poi_count,
         road_type_counts[0],
         road_type_counts[1],
         road_type_counts[2],
@@ -265,15 +239,12 @@ fn render_map_binary_internal(
     renderer.draw_background();
     time_end("render_map_bin: draw_background");
 
-    let water_color = renderer.get_theme().water.clone();
-    let parks_color = renderer.get_theme().parks.clone();
-
     time("render_map_bin: draw_water");
-    renderer.draw_polygons_bin(water_bin, &water_color);
+    renderer.draw_water_bin(water_bin);
     time_end("render_map_bin: draw_water");
 
     time("render_map_bin: draw_parks");
-    renderer.draw_polygons_bin(parks_bin, &parks_color);
+    renderer.draw_parks_bin(parks_bin);
     time_end("render_map_bin: draw_parks");
 
     time("render_map_bin: draw_roads");
@@ -285,46 +256,32 @@ fn render_map_binary_internal(
     );
 
     let mut total_timings = [0.0; 6];
-
-    if js_sys::Array::is_array(&roads_shards) {
-        let shards_array = js_sys::Array::from(&roads_shards);
-        for shard_val in shards_array.iter() {
-            if let Some(shard_typed) = shard_val.dyn_ref::<js_sys::Float64Array>() {
-                let timings =
-                    renderer.draw_roads_bin_scaled(&shard_typed.to_vec(), road_width_scale);
-                for i in 0..6 {
-                    total_timings[i] += timings[i];
-                }
-            }
+    for shard in &shards {
+        let timings = renderer.draw_roads_bin_scaled(shard, road_width_scale);
+        for i in 0..6 {
+            total_timings[i] += timings[i];
         }
-    } else if let Some(shard_typed) = roads_shards.dyn_ref::<js_sys::Float64Array>() {
-        total_timings = renderer.draw_roads_bin_scaled(&shard_typed.to_vec(), road_width_scale);
     }
 
     time_end("render_map_bin: draw_roads");
 
-    log("render_map_bin: draw_roads breakdown:");
-    log(&format!("  Motorway: {:.2}ms", total_timings[0]));
-    log(&format!("  Primary: {:.2}ms", total_timings[1]));
-    log(&format!("  Secondary: {:.2}ms", total_timings[2]));
-    log(&format!("  Tertiary: {:.2}ms", total_timings[3]));
-    log(&format!("  Residential: {:.2}ms", total_timings[4]));
-    log(&format!("  Default: {:.2}ms", total_timings[5]));
+    log(&format!(
+        "render_map_bin: draw_roads breakdown:\n  Motorway: {:.2}ms\n  Primary: {:.2}ms\n  \
+         Secondary: {:.2}ms\n  Tertiary: {:.2}ms\n  Residential: {:.2}ms\n  Default: {:.2}ms",
+        total_timings[0],
+        total_timings[1],
+        total_timings[2],
+        total_timings[3],
+        total_timings[4],
+        total_timings[5]
+    ));
 
     // 投影并绘制 POI
-    if let Some(pois_data) = &config.pois {
-        if !pois_data.is_empty() && pois_data[0] as usize > 0 {
-            let mut projected_pois = pois_data.clone();
-            let poi_count = projected_pois[0] as usize;
-            for i in 0..poi_count {
-                let offset = 1 + i * 2;
-                let (proj_lon, proj_lat) = projection::project_point(
-                    projected_pois[offset],     // lon
-                    projected_pois[offset + 1], // lat
-                );
-                projected_pois[offset] = proj_lon;
-                projected_pois[offset + 1] = proj_lat;
-            }
+    if let Some(mut projected_pois) = config.pois.take() {
+        if !projected_pois.is_empty() && projected_pois[0] as usize > 0 {
+            // 反序列化出的 Vec 已归本函数所有，直接原地投影，不再 clone 一份
+            let poi_count = (projected_pois[0] as usize).min((projected_pois.len() - 1) / 2);
+            projection::project_flat_points_mut(&mut projected_pois[1..1 + poi_count * 2]);
 
             time("render_map_bin: draw_pois");
             renderer.draw_pois_bin(&projected_pois);
@@ -358,6 +315,27 @@ fn render_map_binary_internal(
     RenderResult::success(config.width, config.height, png_data)
 }
 
+/// 统计一个道路分片中各类型道路的数量，返回分片内道路总数
+fn count_roads_by_type(shard: &[f64], counts: &mut [usize; 6]) -> usize {
+    if shard.is_empty() {
+        return 0;
+    }
+    let road_count = shard[0] as usize;
+    let mut offset = 1;
+    for _ in 0..road_count {
+        if offset + 2 > shard.len() {
+            break;
+        }
+        let type_val = shard[offset] as usize;
+        let point_count = shard[offset + 1] as usize;
+        if type_val < 6 {
+            counts[type_val] += 1;
+        }
+        offset += 2 + point_count * 2;
+    }
+    road_count
+}
+
 /// 主渲染函数 (MessagePack 版本)
 #[wasm_bindgen]
 pub fn render_map_msgpack(request_bin: &[u8]) -> RenderResult {
@@ -547,78 +525,17 @@ pub fn process_roads_bin_wasm(data: &[f64]) -> Result<js_sys::Float64Array, JsVa
         return Ok(js_sys::Float64Array::new(&JsValue::NULL));
     }
 
-    let roads = data_processor::parse_roads_bin(data)
-        .map_err(|e| JsValue::from_str(&format!("Error parsing roads binary: {}", e)))?;
-
-    // 预计算总长度，直接分配 Float64Array，避免中间 Vec 分配和复制
-    let total_len: usize = 1 + roads.iter()
-        .map(|r| 2usize + r.coords.len() * 2)
-        .sum::<usize>();
-
-    let array = js_sys::Float64Array::new_with_length(total_len as u32);
-    let mut idx = 0u32;
-    array.set_index(idx, roads.len() as f64);
-    idx += 1;
-
-    for road in roads {
-        array.set_index(idx, road.road_type.to_u32() as f64);
-        idx += 1;
-        array.set_index(idx, road.coords.len() as f64);
-        idx += 1;
-        for (x, y) in road.coords {
-            array.set_index(idx, x);
-            idx += 1;
-            array.set_index(idx, y);
-            idx += 1;
-        }
-    }
-
-    Ok(array)
+    // 投影不改变布局：拷贝一次后原地投影，再一次性写回 JS（避免逐元素 set_index）
+    let mut projected = data.to_vec();
+    data_processor::project_roads_bin_mut(&mut projected);
+    Ok(js_sys::Float64Array::from(&projected[..]))
 }
 
 #[wasm_bindgen]
 pub fn process_polygons_bin_wasm(data: &[f64]) -> Result<js_sys::Float64Array, JsValue> {
-    let polys = data_processor::parse_polygons_bin(data)
-        .map_err(|e| JsValue::from_str(&format!("Error parsing polygons binary: {}", e)))?;
-
-    // 预计算总长度，直接分配 Float64Array，避免中间 Vec 分配和复制
-    let total_len: usize = 1 + polys.iter()
-        .map(|p| {
-            2usize + p.exterior.len() * 2 + 1 + p.interiors.iter()
-                .map(|r| 1usize + r.len() * 2)
-                .sum::<usize>()
-        })
-        .sum::<usize>();
-
-    let array = js_sys::Float64Array::new_with_length(total_len as u32);
-    let mut idx = 0u32;
-    array.set_index(idx, polys.len() as f64);
-    idx += 1;
-
-    for poly in polys {
-        array.set_index(idx, poly.exterior.len() as f64);
-        idx += 1;
-        array.set_index(idx, poly.interiors.len() as f64);
-        idx += 1;
-        for (x, y) in poly.exterior {
-            array.set_index(idx, x);
-            idx += 1;
-            array.set_index(idx, y);
-            idx += 1;
-        }
-        for ring in poly.interiors {
-            array.set_index(idx, ring.len() as f64);
-            idx += 1;
-            for (x, y) in ring {
-                array.set_index(idx, x);
-                idx += 1;
-                array.set_index(idx, y);
-                idx += 1;
-            }
-        }
-    }
-
-    Ok(array)
+    let mut projected = data.to_vec();
+    data_processor::project_polygons_bin_mut(&mut projected);
+    Ok(js_sys::Float64Array::from(&projected[..]))
 }
 
 /// 测试函数
@@ -636,4 +553,16 @@ mod tests {
         let version = get_version();
         assert!(!version.is_empty());
     }
+
+    #[test]
+    fn test_count_roads_by_type() {
+        // 2 条道路: Motorway (2 点) + Residential (3 点)
+        let shard = vec![
+            2.0, 0.0, 2.0, 0.0, 0.0, 1.0, 1.0, 4.0, 3.0, 0.0, 0.0, 1.0, 1.0, 2.0, 2.0,
+        ];
+        let mut counts = [0usize; 6];
+        assert_eq!(count_roads_by_type(&shard, &mut counts), 2);
+        assert_eq!(counts, [1, 0, 0, 0, 1, 0]);
+        assert_eq!(count_roads_by_type(&[], &mut counts), 0);
+    }
 }
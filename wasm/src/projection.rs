@@ -22,6 +22,15 @@ pub fn project_points_mut(coords: &mut [(f64, f64)]) {
     }
 }
 
+/// 批量投影扁平坐标数组 [x1, y1, x2, y2, ...]（原地修改）
+pub fn project_flat_points_mut(xy: &mut [f64]) {
+    for pair in xy.chunks_exact_mut(2) {
+        let (x, y) = project_point(pair[0], pair[1]);
+        pair[0] = x;
+        pair[1] = y;
+    }
+}
+
 /// 批量投影坐标点
 pub fn project_points(coords: &[(f64, f64)]) -> Vec<(f64, f64)> {
     coords
@@ -97,4 +106,12 @@ mod tests {
         // 纵向图，宽度应该小于高度
         assert!(bounds.width() < bounds.height());
     }
+
+    #[test]
+    fn test_project_flat_points_mut() {
+        let mut xy = [2.3522, 48.8566, 0.0, 0.0];
+        project_flat_points_mut(&mut xy);
+        let (x, y) = project_point(2.3522, 48.8566);
+        assert_eq!(xy, [x, y, 0.0, 0.0]);
+    }
 }
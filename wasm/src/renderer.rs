@@ -1,6 +1,10 @@
-use fontdue::layout::{CoordinateSystem, Layout, TextStyle};
+use fontdue::layout::{CoordinateSystem, Layout, LayoutSettings, TextStyle};
 use fontdue::{Font, FontSettings};
+use std::cell::RefCell;
 use std::collections::HashMap;
+use std::collections::hash_map::DefaultHasher;
+use std::hash::{Hash, Hasher};
+use std::rc::Rc;
 use std::sync::LazyLock;
 // [Road Casing] 新增 LineCap / LineJoin，用于道路圆头描边
 use tiny_skia::{
@@ -10,10 +14,51 @@ use tiny_skia::{
 use crate::types::{BoundingBox, PolyFeature, Road, RoadType, TextPosition, Theme};
 use crate::utils::{calculate_font_size, format_city_name, format_coordinates, parse_hex_color};
 
+/// 预解析的主题配色
+///
+/// Theme 里的颜色都是 hex 字符串，创建渲染器时统一解析一次，
+/// 各绘制函数直接取 Color，不必每次调用都走一遍 parse_hex_color
+#[derive(Debug, Clone, Copy)]
+struct ThemeColors {
+    bg: Color,
+    text: Color,
+    gradient: Color,
+    poi: Color,
+    water: Color,
+    parks: Color,
+    /// 按 RoadType::to_u32() 的 index 排列：Motorway=0 … Default=5
+    roads: [Color; 6],
+}
+
+impl ThemeColors {
+    fn from_theme(theme: &Theme) -> Self {
+        let road_hex = [
+            &theme.road_motorway,
+            &theme.road_primary,
+            &theme.road_secondary,
+            &theme.road_tertiary,
+            &theme.road_residential,
+            &theme.road_default,
+        ];
+
+        Self {
+            bg: parse_hex_color(&theme.bg),
+            text: parse_hex_color(&theme.text),
+            gradient: parse_hex_color(&theme.gradient_color),
+            poi: parse_hex_color(&theme.poi_color),
+            water: parse_hex_color(&theme.water),
+            parks: parse_hex_color(&theme.parks),
+            roads: road_hex.map(|hex| parse_hex_color(hex)),
+        }
+    }
+}
+
 /// 地图渲染引擎
 pub struct MapRenderer {
     pixmap: Pixmap,
     theme: Theme,
+    /// theme 的预解析颜色，与 theme 同时创建，之后只读
+    colors: ThemeColors,
     bounds: BoundingBox,
     /// 逻辑输出宽度（最终 PNG 的像素宽，非内部画布宽）
     width: u32,
@@ -41,16 +86,30 @@ impl MapRenderer {
         let render_width = width * render_scale;
         let render_height = height * render_scale;
 
-        let pixmap = Pixmap::new(render_width, render_height)?;
+        // 同尺寸优先复用上一次导出留下的画布，清空后与新建的 Pixmap 等价；
+        // take() 之后尺寸不符的旧画布随 filter 立即释放，再分配新画布，峰值只有一张
+        let cached = PIXMAP_POOL
+            .with(|pool| pool.borrow_mut().take())
+            .filter(|p| p.width() == render_width && p.height() == render_height);
+        let pixmap = match cached {
+            Some(mut p) => {
+                p.fill(Color::TRANSPARENT);
+                p
+            }
+            None => Pixmap::new(render_width, render_height)?,
+        };
 
         // [超采样] x_factor / y_factor 按实际像素尺寸计算，
         // world_to_screen 的输出坐标已自动处于 2× 空间，无需额外调整
         let x_factor = render_width as f64 / bounds.width();
         let y_factor = render_height as f64 / bounds.height();
 
+        let colors = ThemeColors::from_theme(&theme);
+
         Some(Self {
             pixmap,
             theme,
+            colors,
             bounds,
             width, // 仅保存逻辑尺寸，用于 encode_png 最终输出
             height,
@@ -80,24 +139,17 @@ impl MapRenderer {
         self.height * self.render_scale
     }
 
-    // ── [Road Casing] 内部辅助：按道路类型返回主题颜色字符串 ─────────────────
+    // ── [Road Casing] 内部辅助：按道路类型返回主题颜色 ───────────────────────
 
-    /// 根据道路类型返回主题色 hex 字符串引用，避免 match 重复
+    /// 根据道路类型返回预解析的主题色，避免 match 重复
     #[inline]
-    fn road_color_hex(&self, road_type: RoadType) -> &str {
-        match road_type {
-            RoadType::Motorway => &self.theme.road_motorway,
-            RoadType::Primary => &self.theme.road_primary,
-            RoadType::Secondary => &self.theme.road_secondary,
-            RoadType::Tertiary => &self.theme.road_tertiary,
-            RoadType::Residential => &self.theme.road_residential,
-            RoadType::Default => &self.theme.road_default,
-        }
+    fn road_color(&self, road_type: RoadType) -> Color {
+        self.colors.roads[road_type.to_u32() as usize]
     }
 
     /// 绘制背景
     pub fn draw_background(&mut self) {
-        let color = parse_hex_color(&self.theme.bg);
+        let color = self.colors.bg;
         self.pixmap.fill(color);
     }
 
@@ -106,7 +158,7 @@ impl MapRenderer {
         if water_features.is_empty() {
             return;
         }
-        let color = parse_hex_color(&self.theme.water);
+        let color = self.colors.water;
         let mut pb = PathBuilder::new();
         for feature in water_features {
             self.add_poly_to_path(&mut pb, feature);
@@ -132,7 +184,7 @@ impl MapRenderer {
         if park_features.is_empty() {
             return;
         }
-        let color = parse_hex_color(&self.theme.parks);
+        let color = self.colors.parks;
         let mut pb = PathBuilder::new();
         for feature in park_features {
             self.add_poly_to_path(&mut pb, feature);
@@ -177,6 +229,14 @@ impl MapRenderer {
         let mut pbs: Vec<PathBuilder> = (0..6).map(|_| PathBuilder::new()).collect();
         let mut found = vec![false; 6];
 
+        // [视口裁剪] 取最宽的 Casing 作为边距，屏幕包围盒完全落在画布外的道路直接跳过，
+        // 不进入 PathBuilder，减少简化与描边时需要处理的线段数
+        let margin =
+            RoadType::Motorway.get_width_scaled(scale_factor) + 2.0 * self.render_scale as f32;
+        let (min_visible_x, min_visible_y) = (-margin, -margin);
+        let max_visible_x = self.render_width() as f32 + margin;
+        let max_visible_y = self.render_height() as f32 + margin;
+
         let mut curr_offset = 1;
 
         // 【优化】：单次遍历二进制数据，按类型分发到不同的路径构建器
@@ -200,6 +260,23 @@ impl MapRenderer {
                         })
                         .collect();
 
+                    let (mut lo_x, mut lo_y, mut hi_x, mut hi_y) =
+                        (f32::MAX, f32::MAX, f32::MIN, f32::MIN);
+                    for &(sx, sy) in &screen_coords {
+                        lo_x = lo_x.min(sx);
+                        lo_y = lo_y.min(sy);
+                        hi_x = hi_x.max(sx);
+                        hi_y = hi_y.max(sy);
+                    }
+                    if hi_x < min_visible_x
+                        || hi_y < min_visible_y
+                        || lo_x > max_visible_x
+                        || lo_y > max_visible_y
+                    {
+                        curr_offset += count * 2;
+                        continue;
+                    }
+
                     // 简化：epsilon = 0.5 屏幕像素，过滤掉亚像素级冗余点
                     let simplified = simplify_screen_coords(&screen_coords, 0.5 * 0.5); // 传入 epsilon²
 
@@ -221,6 +298,12 @@ impl MapRenderer {
             .map(|(i, pb)| if found[i] { pb.finish() } else { None })
             .collect();
 
+        // 每种道路类型的 (颜色, 宽度) 只计算一次，Casing 与 Fill 两遍共用
+        let styles: [(Color, f32); 6] = std::array::from_fn(|i| {
+            let road_type = RoadType::from_u32(i as u32);
+            (self.road_color(road_type), road_type.get_width_scaled(scale_factor))
+        });
+
         // [Z-order] 道路绘制顺序：低优先级 → 高优先级，确保主干道始终在最上层
         // 枚举 index：Motorway=0, Primary=1, Secondary=2, Tertiary=3, Residential=4, Default=5
         // 从 index 5 向 0 渲染 = 从最低优先级到最高优先级
@@ -240,12 +323,10 @@ impl MapRenderer {
 
             let start = crate::utils::performance_now();
 
-            let road_type = RoadType::from_u32(t_idx as u32);
-            let base_color = parse_hex_color(self.road_color_hex(road_type));
+            let (base_color, road_width) = styles[t_idx];
 
             // [Road Casing] Casing 宽度 = 道路宽 + 两侧各 1 逻辑像素（已含 render_scale 倍数）
-            let casing_width =
-                road_type.get_width_scaled(scale_factor) + 2.0 * self.render_scale as f32;
+            let casing_width = road_width + 2.0 * self.render_scale as f32;
             // [Road Casing] Casing 颜色 = 道路色压暗 50%，形成描边对比
             let mut casing_color = darken_color(base_color, 0.9);
 
@@ -282,14 +363,14 @@ impl MapRenderer {
 
             let start = crate::utils::performance_now();
 
-            let road_type = RoadType::from_u32(t_idx as u32);
+            let (color, road_width) = styles[t_idx];
 
             let mut paint = Paint::default();
-            paint.set_color(parse_hex_color(self.road_color_hex(road_type)));
+            paint.set_color(color);
             paint.anti_alias = true;
 
             let stroke = Stroke {
-                width: road_type.get_width_scaled(scale_factor),
+                width: road_width,
                 line_cap: LineCap::Round,
                 line_join: LineJoin::Round,
                 ..Default::default()
@@ -303,32 +384,45 @@ impl MapRenderer {
         timings
     }
 
+    /// 绘制水体 (二进制直读版)，使用预解析的主题色
+    pub fn draw_water_bin(&mut self, data: &[f64]) {
+        let color = self.colors.water;
+        self.draw_polygons_bin(data, color);
+    }
+
+    /// 绘制公园 (二进制直读版)，使用预解析的主题色
+    pub fn draw_parks_bin(&mut self, data: &[f64]) {
+        let color = self.colors.parks;
+        self.draw_polygons_bin(data, color);
+    }
+
     /// 绘制多边形 (二进制直读版)
-    pub fn draw_polygons_bin(&mut self, data: &[f64], color_hex: &str) {
+    fn draw_polygons_bin(&mut self, data: &[f64], color: Color) {
         if data.is_empty() {
             // 【优化】console::log_1 每次调用都会跨越 JS/WASM 边界，仅在 debug 模式保留
-            #[cfg(debug_assertions)]
+            #[cfg(all(debug_assertions, target_arch = "wasm32"))]
             web_sys::console::log_1(&format!("⚠️  多边形数据为空").into());
             return;
         }
         let poly_count = data[0] as usize;
 
         if poly_count == 0 {
-            #[cfg(debug_assertions)]
-            web_sys::console::log_1(&format!("⚠️  多边形数量为 0，颜色: {}", color_hex).into());
+            #[cfg(all(debug_assertions, target_arch = "wasm32"))]
+            web_sys::console::log_1(&format!("⚠️  多边形数量为 0，颜色: {:?}", color).into());
             return;
         }
 
-        #[cfg(debug_assertions)]
+        #[cfg(all(debug_assertions, target_arch = "wasm32"))]
         web_sys::console::log_1(
-            &format!("🌊 开始绘制 {} 个多边形，颜色: {}", poly_count, color_hex).into(),
+            &format!("🌊 开始绘制 {} 个多边形，颜色: {:?}", poly_count, color).into(),
         );
 
         let mut offset = 1;
-        let color = parse_hex_color(color_hex);
 
         let mut pb = PathBuilder::new();
         let mut found = false;
+        // 复用的屏幕坐标缓冲区，避免每个环都分配
+        let mut screen_coords: Vec<(f32, f32)> = Vec::new();
 
         for _idx in 0..poly_count {
             if offset + 2 > data.len() {
@@ -339,15 +433,11 @@ impl MapRenderer {
             offset += 2;
 
             if offset + ext_count * 2 <= data.len() && ext_count >= 3 {
-                let (sx, sy) = self.world_to_screen((data[offset], data[offset + 1]));
-                pb.move_to(sx, sy);
-                for i in 1..ext_count {
-                    let (sx, sy) =
-                        self.world_to_screen((data[offset + i * 2], data[offset + i * 2 + 1]));
-                    pb.line_to(sx, sy);
-                }
-                pb.close();
-                found = true;
+                found |= self.add_ring_bin(
+                    &mut pb,
+                    &data[offset..offset + ext_count * 2],
+                    &mut screen_coords,
+                );
             }
             offset += ext_count * 2;
 
@@ -358,14 +448,11 @@ impl MapRenderer {
                 let count = data[offset] as usize;
                 offset += 1;
                 if offset + count * 2 <= data.len() && count >= 3 {
-                    let (sx, sy) = self.world_to_screen((data[offset], data[offset + 1]));
-                    pb.move_to(sx, sy);
-                    for i in 1..count {
-                        let (sx, sy) =
-                            self.world_to_screen((data[offset + i * 2], data[offset + i * 2 + 1]));
-                        pb.line_to(sx, sy);
-                    }
-                    pb.close();
+                    self.add_ring_bin(
+                        &mut pb,
+                        &data[offset..offset + count * 2],
+                        &mut screen_coords,
+                    );
                 }
                 offset += count * 2;
             }
@@ -383,13 +470,13 @@ impl MapRenderer {
                     Transform::identity(),
                     None,
                 );
-                #[cfg(debug_assertions)]
-                web_sys::console::log_1(&format!("✅ 多边形绘制完成，颜色: {}", color_hex).into());
+                #[cfg(all(debug_assertions, target_arch = "wasm32"))]
+                web_sys::console::log_1(&format!("✅ 多边形绘制完成，颜色: {:?}", color).into());
             }
         } else {
-            #[cfg(debug_assertions)]
+            #[cfg(all(debug_assertions, target_arch = "wasm32"))]
             web_sys::console::log_1(
-                &format!("⚠️  未找到有效的多边形数据，颜色: {}", color_hex).into(),
+                &format!("⚠️  未找到有效的多边形数据，颜色: {:?}", color).into(),
             );
         }
     }
@@ -445,7 +532,7 @@ impl MapRenderer {
                 continue;
             };
             let road_type = crate::types::RoadType::from_u32(t_idx as u32);
-            let base_color = parse_hex_color(self.road_color_hex(road_type));
+            let base_color = self.road_color(road_type);
             let casing_width =
                 road_type.get_width_scaled(scale_factor) + 2.0 * self.render_scale as f32;
             let mut casing_color = darken_color(base_color, 0.9);
@@ -481,7 +568,7 @@ impl MapRenderer {
             let road_type = crate::types::RoadType::from_u32(t_idx as u32);
 
             let mut paint = Paint::default();
-            paint.set_color(parse_hex_color(self.road_color_hex(road_type)));
+            paint.set_color(self.road_color(road_type));
             paint.anti_alias = true;
 
             let stroke = Stroke {
@@ -511,7 +598,7 @@ impl MapRenderer {
         let scale_factor = scale_factor * self.render_scale as f32;
 
         // 使用主题中的 POI 专用颜色
-        let poi_color = parse_hex_color(&self.theme.poi_color);
+        let poi_color = self.colors.poi;
 
         let poi_radius = 10.0 * scale_factor; // POI 圆点半径随分辨率缩放
         let min_spacing = 8.0 * scale_factor; // POI 之间最小间距（像素）
@@ -622,7 +709,7 @@ impl MapRenderer {
         }
 
         // 使用主题中的 POI 专用颜色
-        let poi_color = parse_hex_color(&self.theme.poi_color);
+        let poi_color = self.colors.poi;
 
         let poi_radius = 8.0 * scale_factor; // POI 圆点半径随分辨率缩放
         let min_spacing = 5.0 * scale_factor; // POI 之间最小间距随分辨率缩放
@@ -715,30 +802,31 @@ impl MapRenderer {
 
     /// 绘制渐变（顶部和底部）
     pub fn draw_gradients(&mut self) {
-        let gradient_color = parse_hex_color(&self.theme.gradient_color);
+        let gradient_color = self.colors.gradient;
 
-        // 底部渐变
-        self.draw_gradient("bottom", gradient_color);
+        // [超采样] 使用实际画布尺寸，确保渐变覆盖完整 2× 画布；两条渐变带的范围只计算一次
+        let height = self.render_height();
+        let bottom_band = ((height as f32 * 0.75) as u32, height);
+        let top_band = (0, (height as f32 * 0.25) as u32);
+
+        // 底部渐变：越往下越浓
+        self.draw_gradient(bottom_band, true, gradient_color);
 
-        // 顶部渐变
-        self.draw_gradient("top", gradient_color);
+        // 顶部渐变：越往上越浓
+        self.draw_gradient(top_band, false, gradient_color);
     }
 
     /// 绘制单个渐变（手动扫描线优化）
-    fn draw_gradient(&mut self, location: &str, base_color: Color) {
-        // [超采样] 使用实际画布尺寸，确保渐变覆盖完整 2× 画布
-        let height = self.render_height();
+    ///
+    /// `denser_towards_end` 为 true 时 alpha 随 y 增大而增大（底部），否则相反（顶部）
+    fn draw_gradient(&mut self, band: (u32, u32), denser_towards_end: bool, base_color: Color) {
+        let (y_start, y_end) = band;
         let width = self.render_width();
 
-        let (y_start, y_end) = if location == "bottom" {
-            ((height as f32 * 0.75) as u32, height)
-        } else {
-            (0, (height as f32 * 0.25) as u32)
-        };
-
         if y_start >= y_end {
             return;
         }
+        let inv_span = 1.0 / (y_end - y_start) as f32;
 
         let pixels = self.pixmap.pixels_mut();
         let base_r = base_color.red();
@@ -753,10 +841,10 @@ impl MapRenderer {
         let lin_base_b = srgb_to_linear(base_b);
 
         for y in y_start..y_end {
-            let t = if location == "bottom" {
-                (y - y_start) as f32 / (y_end - y_start) as f32
+            let t = if denser_towards_end {
+                (y - y_start) as f32 * inv_span
             } else {
-                (y_end - y) as f32 / (y_end - y_start) as f32
+                (y_end - y) as f32 * inv_span
             };
 
             // 计算当前行的源透明度
@@ -771,12 +859,31 @@ impl MapRenderer {
             let src_g_lin = lin_base_g * src_a;
             let src_b_lin = lin_base_b * src_a;
 
+            // [优化] 背景已铺满不透明色，目标像素几乎总是不透明：此时结果只取决于通道值，
+            // 每行预计算 256 项混合结果表（u8），逐像素只需三次查表
+            let lut_r = blend_opaque_row_lut(src_r_lin, inv_src_a);
+            let lut_g = blend_opaque_row_lut(src_g_lin, inv_src_a);
+            let lut_b = blend_opaque_row_lut(src_b_lin, inv_src_a);
+
             let row_start = (y * width) as usize;
             let row_end = row_start + width as usize;
             let row = &mut pixels[row_start..row_end];
 
             for p in row.iter_mut() {
                 let dst_a = p.alpha();
+                if dst_a == 255 {
+                    if let Some(c) = tiny_skia::PremultipliedColorU8::from_rgba(
+                        lut_r[p.red() as usize],
+                        lut_g[p.green() as usize],
+                        lut_b[p.blue() as usize],
+                        255,
+                    ) {
+                        *p = c;
+                    }
+                    continue;
+                }
+
+                // 半透明目标像素：走通用的解预乘 → 线性混合路径
                 let dst_a_f = dst_a as f32 / 255.0;
 
                 // [Gamma校正] 解预乘目标像素，转换到线性光空间，再预乘（用于 SrcOver）
@@ -829,6 +936,40 @@ impl MapRenderer {
         }
     }
 
+    /// 把一个多边形环（世界坐标 [x1, y1, x2, y2, ...]）转为屏幕坐标并追加到路径
+    ///
+    /// 与道路相同，按 0.5 屏幕像素做 Douglas-Peucker 简化：海岸线/河流这类
+    /// 顶点密集的环在海报尺度下大量点落在同一像素内。
+    /// 闭合环至少要 4 个点（3 个顶点 + 闭合点）：细长的河道多边形两侧都在 0.5px 内时
+    /// 会塌成 [起点, 远端, 起点]，此时退回原始坐标，避免整段河道消失。
+    /// 原始坐标也不足 3 个点时无法构成面，返回 false
+    fn add_ring_bin(
+        &self,
+        pb: &mut PathBuilder,
+        xy: &[f64],
+        screen_coords: &mut Vec<(f32, f32)>,
+    ) -> bool {
+        screen_coords.clear();
+        screen_coords.extend(xy.chunks_exact(2).map(|p| self.world_to_screen((p[0], p[1]))));
+
+        let simplified = simplify_screen_coords(screen_coords, 0.5 * 0.5); // 传入 epsilon²
+        let ring: &[(f32, f32)] = if simplified.len() >= 4 {
+            &simplified
+        } else {
+            screen_coords
+        };
+        if ring.len() < 3 {
+            return false;
+        }
+
+        pb.move_to(ring[0].0, ring[0].1);
+        for &(sx, sy) in &ring[1..] {
+            pb.line_to(sx, sy);
+        }
+        pb.close();
+        true
+    }
+
     fn add_poly_to_path(&self, pb: &mut PathBuilder, poly: &PolyFeature) {
         if poly.exterior.len() < 3 {
             return;
@@ -867,10 +1008,11 @@ impl MapRenderer {
         lon: f64,
         font_data: &[u8],
     ) -> Result<(), String> {
-        let font = Font::from_bytes(font_data, FontSettings::default())
-            .map_err(|e| format!("Failed to load font: {}", e))?;
+        let font = load_font_cached(font_data)?;
+        // [优化] 四段文字共用一个 Layout，每次绘制前 reset，避免重复分配字形缓冲区
+        let mut layout = Layout::new(CoordinateSystem::PositiveYDown);
 
-        let text_color = parse_hex_color(&self.theme.text);
+        let text_color = self.colors.text;
 
         // 改进：限制缩放系数
         // 取 Width/800 和 Height/800*1.1 中的较小值。
@@ -922,6 +1064,7 @@ impl MapRenderer {
         let city_size = calculate_font_size(&formatted_city, 80.0 * scale_factor, threshold);
         // 位置：锚点 + 偏移
         self.draw_text_centered(
+            &mut layout,
             &font,
             &formatted_city,
             base_y_px + city_offset,
@@ -933,13 +1076,21 @@ impl MapRenderer {
         let country_upper = country.to_uppercase();
         let country_size = 28.0 * scale_factor;
         // 位置：锚点本身
-        self.draw_text_centered(&font, &country_upper, base_y_px, country_size, text_color);
+        self.draw_text_centered(
+            &mut layout,
+            &font,
+            &country_upper,
+            base_y_px,
+            country_size,
+            text_color,
+        );
 
         // 绘制坐标 (增加基准大小到 18.0)
         let coords_str = format_coordinates(lat, lon);
         let coords_size = 18.0 * scale_factor;
         // 位置：锚点 - 偏移
         self.draw_text_centered(
+            &mut layout,
             &font,
             &coords_str,
             base_y_px + coords_offset,
@@ -953,6 +1104,7 @@ impl MapRenderer {
         // 绘制署名 (修正底部边距逻辑)
         let attr_text = "© OpenStreetMap contributors";
         self.draw_text_bottom_right(
+            &mut layout,
             &font,
             attr_text,
             10.0 * scale_factor,
@@ -966,13 +1118,14 @@ impl MapRenderer {
     /// 居中绘制文字
     fn draw_text_centered(
         &mut self,
+        layout: &mut Layout,
         font: &Font,
         text: &str,
         y_baseline: f32, // 改为绝对坐标
         size: f32,
         color: Color,
     ) {
-        let mut layout = Layout::new(CoordinateSystem::PositiveYDown);
+        layout.reset(&LayoutSettings::default());
         layout.append(&[font], &TextStyle::new(text, size, 0));
 
         let y = y_baseline as i32;
@@ -1010,13 +1163,14 @@ impl MapRenderer {
     /// 右下角绘制文字
     fn draw_text_bottom_right(
         &mut self,
+        layout: &mut Layout,
         font: &Font,
         text: &str,
         size: f32,
         color: Color,
         scale_factor: f32,
     ) {
-        let mut layout = Layout::new(CoordinateSystem::PositiveYDown);
+        layout.reset(&LayoutSettings::default());
         layout.append(&[font], &TextStyle::new(text, size, 0));
 
         let glyphs = layout.glyphs();
@@ -1196,10 +1350,12 @@ impl MapRenderer {
 
         // [超采样] 步骤 2：Box Filter 下采样——每 scale×scale 块的源像素取算术平均
         // Box Filter 等价于对高频锯齿做低通滤波，结合 2× 超采样可显著消除锯齿
-        let mut out_rgba: Vec<u8> = Vec::with_capacity(out_w * out_h * 4);
+        // [优化] draw_background 总是先用不透明背景色铺满画布，成品必然完全不透明，
+        // 因此只输出 RGB 三通道：待压缩数据少 1/4，PNG 体积与编码耗时随之下降
+        let mut out_rgb: Vec<u8> = Vec::with_capacity(out_w * out_h * 3);
         for oy in 0..out_h {
             for ox in 0..out_w {
-                let mut acc = [0f32; 4];
+                let mut acc = [0f32; 3];
                 for dy in 0..scale {
                     for dx in 0..scale {
                         let p = src_pixels[(oy * scale + dy) * src_w + ox * scale + dx];
@@ -1211,48 +1367,69 @@ impl MapRenderer {
                             acc[1] += p.green() as f32 * inv;
                             acc[2] += p.blue() as f32 * inv;
                         }
-                        acc[3] += a as f32;
                     }
                 }
-                out_rgba.push((acc[0] / scale_sq * 255.0 + 0.5).min(255.0) as u8);
-                out_rgba.push((acc[1] / scale_sq * 255.0 + 0.5).min(255.0) as u8);
-                out_rgba.push((acc[2] / scale_sq * 255.0 + 0.5).min(255.0) as u8);
-                out_rgba.push((acc[3] / scale_sq + 0.5).min(255.0) as u8);
+                out_rgb.push((acc[0] / scale_sq * 255.0 + 0.5).min(255.0) as u8);
+                out_rgb.push((acc[1] / scale_sq * 255.0 + 0.5).min(255.0) as u8);
+                out_rgb.push((acc[2] / scale_sq * 255.0 + 0.5).min(255.0) as u8);
             }
         }
 
-        // [超采样] 步骤 3：将下采样后的 RGBA 数据编码为 PNG
-        let raw = encode_rgba_to_png(&out_rgba, out_w as u32, out_h as u32)?;
-
-        // pHYs chunk 构造（逻辑不变）
-        let ppm = (dpi as u64 * 10000 / 254) as u32; // 300 DPI = 11811
-        let mut phys: Vec<u8> = Vec::with_capacity(21);
-
-        // chunk data length = 9 bytes
-        phys.extend_from_slice(&9u32.to_be_bytes());
-        // chunk type: "pHYs"
-        phys.extend_from_slice(b"pHYs");
-        // pixels per unit X (big-endian)
-        phys.extend_from_slice(&ppm.to_be_bytes());
-        // pixels per unit Y (big-endian)
-        phys.extend_from_slice(&ppm.to_be_bytes());
-        // unit: 1 = meter
-        phys.push(1u8);
-        // CRC-32 (覆盖 type + data)
-        let crc = crc32(&phys[4..17]);
-        phys.extend_from_slice(&crc.to_be_bytes());
-
-        // 在 IHDR 之后 (offset 33) 插入 pHYs chunk
-        let insert_pos = 33;
-        let mut result = Vec::with_capacity(raw.len() + 21);
-        result.extend_from_slice(&raw[..insert_pos]);
-        result.extend_from_slice(&phys);
-        result.extend_from_slice(&raw[insert_pos..]);
-
-        Ok(result)
+        // 像素已读完，画布交还给复用池，供同一 Worker 的下一次导出使用
+        let pixmap = self.pixmap;
+        PIXMAP_POOL.with(|pool| *pool.borrow_mut() = Some(pixmap));
+
+        // [超采样] 步骤 3：将下采样后的 RGB 数据编码为 PNG
+        // [优化] pHYs (DPI) 由编码器在 IHDR 之后直接写出，不再编码完成后
+        // 再把整张 PNG 拷贝一遍去插入 chunk
+        encode_rgb_to_png(&out_rgb, out_w as u32, out_h as u32, dpi)
     }
 }
 
+// ── 画布复用 ────────────────────────────────────────────────────────────────
+
+thread_local! {
+    /// 上一次渲染使用的 2× 画布（海报尺寸下可达数百 MB）
+    /// WASM 线性内存只增不减，释放后也不会归还给浏览器；同尺寸连续导出时直接复用，
+    /// 省去一次大块分配，也避免与其他大分配交替导致内存碎片或再次 grow
+    ///
+    /// 尺寸变化时旧画布在分配新画布之前就被丢弃，池中最多只有一张画布。
+    /// 画布的生命周期依赖前端 Worker 池的空闲销毁（App.tsx 的 releaseWorkerPool）：
+    /// 只有 terminate Worker 才能真正归还这部分内存，这里不做额外的释放
+    static PIXMAP_POOL: RefCell<Option<Pixmap>> = const { RefCell::new(None) };
+}
+
+// ── 字体缓存 ────────────────────────────────────────────────────────────────
+
+thread_local! {
+    /// 最近一次解析的字体：(字体数据哈希, 解析结果)
+    /// Worker 被复用后，连续导出基本都用同一字体；Font::from_bytes 要解析整个字体文件
+    /// （自定义 CJK 字体可达数 MB），按内容哈希命中时直接复用
+    static FONT_CACHE: RefCell<Option<(u64, Rc<Font>)>> = const { RefCell::new(None) };
+}
+
+/// 解析字体，内容与上次相同则直接返回缓存的 Font
+fn load_font_cached(font_data: &[u8]) -> Result<Rc<Font>, String> {
+    let mut hasher = DefaultHasher::new();
+    font_data.hash(&mut hasher);
+    let key = hasher.finish();
+
+    FONT_CACHE.with(|cache| {
+        if let Some((cached_key, font)) = cache.borrow().as_ref() {
+            if *cached_key == key {
+                return Ok(Rc::clone(font));
+            }
+        }
+
+        let font = Rc::new(
+            Font::from_bytes(font_data, FontSettings::default())
+                .map_err(|e| format!("Failed to load font: {}", e))?,
+        );
+        *cache.borrow_mut() = Some((key, Rc::clone(&font)));
+        Ok(font)
+    })
+}
+
 // ── [Gamma校正] sRGB ↔ 线性光转换工具函数 ────────────────────────────────────
 
 /// [Gamma校正] sRGB -> 线性光（IEC 61966-2-1 标准）
@@ -1290,6 +1467,17 @@ static LIN_TO_SRGB_LUT: LazyLock<[u8; 1024]> = LazyLock::new(|| {
     std::array::from_fn(|i| (linear_to_srgb(i as f32 / 1023.0) * 255.0 + 0.5).min(255.0) as u8)
 });
 
+/// 计算不透明目标像素在某一渐变行上的混合结果表
+///
+/// 索引为目标像素的 sRGB 通道值，结果与通用 SrcOver 路径（dst_a = 1）一致
+#[inline]
+fn blend_opaque_row_lut(src_lin: f32, inv_src_a: f32) -> [u8; 256] {
+    std::array::from_fn(|v| {
+        let out_lin = src_lin + SRGB_TO_LIN_LUT[v] * inv_src_a;
+        LIN_TO_SRGB_LUT[(out_lin * 1023.0 + 0.5).clamp(0.0, 1023.0) as usize]
+    })
+}
+
 // ── [Road Casing] 颜色压暗工具函数 ──────────────────────────────────────────
 
 /// [Road Casing] 按比例压暗颜色，用于生成道路的描边底色（Casing）
@@ -1306,104 +1494,83 @@ fn darken_color(color: Color, factor: f32) -> Color {
 
 // ── [超采样] PNG 编码工具函数 ─────────────────────────────────────────────────
 
-/// [超采样] 将直线性 RGBA 字节数组编码为 PNG 格式（使用 `png` crate）
-fn encode_rgba_to_png(rgba: &[u8], width: u32, height: u32) -> Result<Vec<u8>, String> {
+/// [超采样] 将直线性 RGB 字节数组编码为 PNG 格式（使用 `png` crate）
+/// dpi 写入 pHYs chunk，单位换算为像素/米（300 DPI = 11811）
+fn encode_rgb_to_png(rgb: &[u8], width: u32, height: u32, dpi: u32) -> Result<Vec<u8>, String> {
+    let ppm = (dpi as u64 * 10000 / 254) as u32;
+
     let mut buf = Vec::new();
     {
         let mut encoder = png::Encoder::new(&mut buf, width, height);
-        encoder.set_color(png::ColorType::Rgba);
+        encoder.set_color(png::ColorType::Rgb);
         encoder.set_depth(png::BitDepth::Eight);
+        encoder.set_pixel_dims(Some(png::PixelDimensions {
+            xppu: ppm,
+            yppu: ppm,
+            unit: png::Unit::Meter,
+        }));
         encoder.set_compression(png::Compression::Fast);
+        // [优化] 显式固定为单一 Sub 滤波：海报大面积纯色背景下 Sub 已足够好，
+        // 自适应滤波要对每行试算 5 种滤波器，编码耗时成倍增加而体积收益很小
+        encoder.set_filter(png::FilterType::Sub);
+        encoder.set_adaptive_filter(png::AdaptiveFilterType::NonAdaptive);
         let mut writer = encoder
             .write_header()
             .map_err(|e| format!("PNG header write failed: {}", e))?;
         writer
-            .write_image_data(rgba)
+            .write_image_data(rgb)
             .map_err(|e| format!("PNG data write failed: {}", e))?;
     }
     Ok(buf)
 }
 
-/// 计算 CRC-32 (PNG 标准 ISO 3309)
-fn crc32(data: &[u8]) -> u32 {
-    // CRC-32 lookup table
-    static CRC_TABLE: [u32; 256] = [
-        0x00000000, 0x77073096, 0xEE0E612C, 0x990951BA, 0x076DC419, 0x706AF48F, 0xE963A535,
-        0x9E6495A3, 0x0EDB8832, 0x79DCB8A4, 0xE0D5E91E, 0x97D2D988, 0x09B64C2B, 0x7EB17CBD,
-        0xE7B82D07, 0x90BF1D91, 0x1DB71064, 0x6AB020F2, 0xF3B97148, 0x84BE41DE, 0x1ADAD47D,
-        0x6DDDE4EB, 0xF4D4B551, 0x83D385C7, 0x136C9856, 0x646BA8C0, 0xFD62F97A, 0x8A65C9EC,
-        0x14015C4F, 0x63066CD9, 0xFA0F3D63, 0x8D080DF5, 0x3B6E20C8, 0x4C69105E, 0xD56041E4,
-        0xA2677172, 0x3C03E4D1, 0x4B04D447, 0xD20D85FD, 0xA50AB56B, 0x35B5A8FA, 0x42B2986C,
-        0xDBBBC9D6, 0xACBCF940, 0x32D86CE3, 0x45DF5C75, 0xDCD60DCF, 0xABD13D59, 0x26D930AC,
-        0x51DE003A, 0xC8D75180, 0xBFD06116, 0x21B4F4B5, 0x56B3C423, 0xCFBA9599, 0xB8BDA50F,
-        0x2802B89E, 0x5F058808, 0xC60CD9B2, 0xB10BE924, 0x2F6F7C87, 0x58684C11, 0xC1611DAB,
-        0xB6662D3D, 0x76DC4190, 0x01DB7106, 0x98D220BC, 0xEFD5102A, 0x71B18589, 0x06B6B51F,
-        0x9FBFE4A5, 0xE8B8D433, 0x7807C9A2, 0x0F00F934, 0x9609A88E, 0xE10E9818, 0x7F6A0DBB,
-        0x086D3D2D, 0x91646C97, 0xE6635C01, 0x6B6B51F4, 0x1C6C6162, 0x856530D8, 0xF262004E,
-        0x6C0695ED, 0x1B01A57B, 0x8208F4C1, 0xF50FC457, 0x65B0D9C6, 0x12B7E950, 0x8BBEB8EA,
-        0xFCB9887C, 0x62DD1DDF, 0x15DA2D49, 0x8CD37CF3, 0xFBD44C65, 0x4DB26158, 0x3AB551CE,
-        0xA3BC0074, 0xD4BB30E2, 0x4ADFA541, 0x3DD895D7, 0xA4D1C46D, 0xD3D6F4FB, 0x4369E96A,
-        0x346ED9FC, 0xAD678846, 0xDA60B8D0, 0x44042D73, 0x33031DE5, 0xAA0A4C5F, 0xDD0D7CC9,
-        0x5005713C, 0x270241AA, 0xBE0B1010, 0xC90C2086, 0x5768B525, 0x206F85B3, 0xB966D409,
-        0xCE61E49F, 0x5EDEF90E, 0x29D9C998, 0xB0D09822, 0xC7D7A8B4, 0x59B33D17, 0x2EB40D81,
-        0xB7BD5C3B, 0xC0BA6CAD, 0xEDB88320, 0x9ABFB3B6, 0x03B6E20C, 0x74B1D29A, 0xEAD54739,
-        0x9DD277AF, 0x04DB2615, 0x73DC1683, 0xE3630B12, 0x94643B84, 0x0D6D6A3E, 0x7A6A5AA8,
-        0xE40ECF0B, 0x9309FF9D, 0x0A00AE27, 0x7D079EB1, 0xF00F9344, 0x8708A3D2, 0x1E01F268,
-        0x6906C2FE, 0xF762575D, 0x806567CB, 0x196C3671, 0x6E6B06E7, 0xFED41B76, 0x89D32BE0,
-        0x10DA7A5A, 0x67DD4ACC, 0xF9B9DF6F, 0x8EBEEFF9, 0x17B7BE43, 0x60B08ED5, 0xD6D6A3E8,
-        0xA1D1937E, 0x38D8C2C4, 0x4FDFF252, 0xD1BB67F1, 0xA6BC5767, 0x3FB506DD, 0x48B2364B,
-        0xD80D2BDA, 0xAF0A1B4C, 0x36034AF6, 0x41047A60, 0xDF60EFC3, 0xA867DF55, 0x316E8EEF,
-        0x4669BE79, 0xCB61B38C, 0xBC66831A, 0x256FD2A0, 0x5268E236, 0xCC0C7795, 0xBB0B4703,
-        0x220216B9, 0x5505262F, 0xC5BA3BBE, 0xB2BD0B28, 0x2BB45A92, 0x5CB36A04, 0xC2D7FFA7,
-        0xB5D0CF31, 0x2CD99E8B, 0x5BDEAE1D, 0x9B64C2B0, 0xEC63F226, 0x756AA39C, 0x026D930A,
-        0x9C0906A9, 0xEB0E363F, 0x72076785, 0x05005713, 0x95BF4A82, 0xE2B87A14, 0x7BB12BAE,
-        0x0CB61B38, 0x92D28E9B, 0xE5D5BE0D, 0x7CDCEFB7, 0x0BDBDF21, 0x86D3D2D4, 0xF1D4E242,
-        0x68DDB3F8, 0x1FDA836E, 0x81BE16CD, 0xF6B9265B, 0x6FB077E1, 0x18B74777, 0x88085AE6,
-        0xFF0F6A70, 0x66063BCA, 0x11010B5C, 0x8F659EFF, 0xF862AE69, 0x616BFFD3, 0x166CCF45,
-        0xA00AE278, 0xD70DD2EE, 0x4E048354, 0x3903B3C2, 0xA7672661, 0xD06016F7, 0x4969474D,
-        0x3E6E77DB, 0xAED16A4A, 0xD9D65ADC, 0x40DF0B66, 0x37D83BF0, 0xA9BCAE53, 0xDEBB9EC5,
-        0x47B2CF7F, 0x30B5FFE9, 0xBDBDF21C, 0xCABAC28A, 0x53B39330, 0x24B4A3A6, 0xBAD03605,
-        0xCDD70693, 0x54DE5729, 0x23D967BF, 0xB3667A2E, 0xC4614AB8, 0x5D681B02, 0x2A6F2B94,
-        0xB40BBE37, 0xC30C8EA1, 0x5A05DF1B, 0x2D02EF8D,
-    ];
-
-    let mut crc: u32 = 0xFFFFFFFF;
-    for &byte in data {
-        let idx = ((crc ^ byte as u32) & 0xFF) as usize;
-        crc = (crc >> 8) ^ CRC_TABLE[idx];
-    }
-    crc ^ 0xFFFFFFFF
-}
-
 /// Douglas-Peucker 折线简化，在屏幕坐标空间消除亚像素级冗余点
 /// epsilon_sq：距离阈值的平方（传入 epsilon² 避免 sqrt 开销）
 /// 推荐值：道路传 0.25（= 0.5px²），多边形传 1.0（= 1.0px²）
+///
+/// 用显式栈代替递归：海岸线/海洋多边形单环可达数万顶点，分割点偏向一侧时
+/// 递归深度接近 n，会撑爆 WASM 较小的调用栈。结果与递归版本一致
 fn simplify_screen_coords(coords: &[(f32, f32)], epsilon_sq: f32) -> Vec<(f32, f32)> {
     if coords.len() < 3 {
         return coords.to_vec();
     }
 
-    let (first, last) = (coords[0], *coords.last().unwrap());
-    let mut max_dist_sq = 0f32;
-    let mut max_idx = 0;
+    let last_idx = coords.len() - 1;
+    let mut keep = vec![false; coords.len()];
+    keep[0] = true;
+    keep[last_idx] = true;
 
-    for (i, &p) in coords[1..coords.len() - 1].iter().enumerate() {
-        let d = point_to_segment_dist_sq(p, first, last);
-        if d > max_dist_sq {
-            max_dist_sq = d;
-            max_idx = i + 1;
+    // 待处理的区间 [start, end]，两端点已保留
+    let mut stack = vec![(0usize, last_idx)];
+    while let Some((start, end)) = stack.pop() {
+        if end - start < 2 {
+            continue;
         }
-    }
 
-    if max_dist_sq > epsilon_sq {
-        let mut left = simplify_screen_coords(&coords[..=max_idx], epsilon_sq);
-        let right = simplify_screen_coords(&coords[max_idx..], epsilon_sq);
-        left.pop(); // 去掉重复的分割点
-        left.extend(right);
-        left
-    } else {
-        vec![first, last]
+        let (first, last) = (coords[start], coords[end]);
+        let mut max_dist_sq = 0f32;
+        let mut max_idx = start;
+
+        for (i, &p) in coords[start + 1..end].iter().enumerate() {
+            let d = point_to_segment_dist_sq(p, first, last);
+            if d > max_dist_sq {
+                max_dist_sq = d;
+                max_idx = start + 1 + i;
+            }
+        }
+
+        if max_dist_sq > epsilon_sq {
+            keep[max_idx] = true;
+            stack.push((start, max_idx));
+            stack.push((max_idx, end));
+        }
     }
+
+    coords
+        .iter()
+        .zip(&keep)
+        .filter_map(|(&p, &k)| k.then_some(p))
+        .collect()
 }
 
 /// 点到线段的距离平方（避免 sqrt）
@@ -1422,3 +1589,90 @@ fn point_to_segment_dist_sq(p: (f32, f32), a: (f32, f32), b: (f32, f32)) -> f32
     let (ex, ey) = (p.0 - cx, p.1 - cy);
     ex * ex + ey * ey
 }
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    fn test_theme() -> Theme {
+        Theme {
+            bg: "#FFFFFF".to_string(),
+            text: "#000000".to_string(),
+            gradient_color: "#FFFFFF".to_string(),
+            poi_color: "#000000".to_string(),
+            water: "#336699".to_string(),
+            parks: "#88AA44".to_string(),
+            road_motorway: "#000000".to_string(),
+            road_primary: "#000000".to_string(),
+            road_secondary: "#000000".to_string(),
+            road_tertiary: "#000000".to_string(),
+            road_residential: "#000000".to_string(),
+            road_default: "#000000".to_string(),
+        }
+    }
+
+    #[test]
+    fn test_draw_polygons_bin_uses_cached_theme_colors() {
+        let bounds = BoundingBox::new(0.0, 10.0, 0.0, 10.0);
+        let mut renderer =
+            MapRenderer::new(10, 10, test_theme(), bounds, TextPosition::Bottom).unwrap();
+        // 一个覆盖整个画布的四边形：[poly_count, ext_count, hole_count, x1, y1, ...]
+        let covering = [1.0, 4.0, 0.0, -1.0, -1.0, 11.0, -1.0, 11.0, 11.0, -1.0, 11.0];
+
+        renderer.draw_background();
+        renderer.draw_water_bin(&covering);
+        let p = renderer.pixmap.pixel(10, 10).unwrap();
+        assert_eq!((p.red(), p.green(), p.blue(), p.alpha()), (0x33, 0x66, 0x99, 255));
+
+        renderer.draw_parks_bin(&covering);
+        let p = renderer.pixmap.pixel(10, 10).unwrap();
+        assert_eq!((p.red(), p.green(), p.blue(), p.alpha()), (0x88, 0xAA, 0x44, 255));
+    }
+
+    #[test]
+    fn test_simplify_screen_coords_drops_collinear_points() {
+        let line: Vec<(f32, f32)> = (0..=100).map(|i| (i as f32, 0.0)).collect();
+        assert_eq!(simplify_screen_coords(&line, 0.25), vec![(0.0, 0.0), (100.0, 0.0)]);
+    }
+
+    #[test]
+    fn test_simplify_screen_coords_keeps_ring_corners() {
+        // 边上每隔 1px 一个点的闭合正方形，简化后只剩 4 个角 + 闭合点
+        let mut ring = Vec::new();
+        for i in 0..10 {
+            ring.push((i as f32, 0.0));
+        }
+        for i in 0..10 {
+            ring.push((10.0, i as f32));
+        }
+        for i in 0..10 {
+            ring.push((10.0 - i as f32, 10.0));
+        }
+        for i in 0..=10 {
+            ring.push((0.0, 10.0 - i as f32));
+        }
+
+        assert_eq!(
+            simplify_screen_coords(&ring, 0.25),
+            vec![(0.0, 0.0), (10.0, 0.0), (10.0, 10.0), (0.0, 10.0), (0.0, 0.0)]
+        );
+    }
+
+    #[test]
+    fn test_simplify_screen_coords_handles_large_rings() {
+        // 数万顶点的单环（如海岸线）不能因递归过深而栈溢出
+        let n = 200_000;
+        let ring: Vec<(f32, f32)> = (0..=n)
+            .map(|i| {
+                let a = i as f32 / n as f32 * std::f32::consts::TAU;
+                (a.cos() * 5000.0, a.sin() * 5000.0)
+            })
+            .collect();
+
+        let simplified = simplify_screen_coords(&ring, 0.25);
+        assert!(simplified.len() >= 4);
+        assert!(simplified.len() < ring.len());
+        assert_eq!(simplified.first(), ring.first());
+        assert_eq!(simplified.last(), ring.last());
+    }
+}
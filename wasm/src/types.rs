@@ -317,8 +317,12 @@ impl RenderResult {
         self.height
     }
 
-    pub fn get_data(&self) -> Option<Vec<u8>> {
-        self.data.clone()
+    /// 返回 PNG 数据
+    ///
+    /// [优化] 直接从 WASM 内存一次性拷贝进 JS 的 Uint8Array；
+    /// 返回 Vec<u8> 需要先 clone 一份整张 PNG，再由 wasm-bindgen 拷贝第二次
+    pub fn get_data(&self) -> Option<js_sys::Uint8Array> {
+        self.data.as_deref().map(js_sys::Uint8Array::from)
     }
 
     pub fn get_error(&self) -> Option<String> {
@@ -38,13 +38,18 @@ pub fn is_latin_script(text: &str) -> bool {
         return true;
     }
 
-    let latin_count = text
+    // 纯 ASCII 快速路径：所有字母都 < 0x250，必然判定为拉丁文
+    if text.is_ascii() {
+        return true;
+    }
+
+    // 单次遍历同时统计字母总数与拉丁字母数
+    let (latin_count, total_alpha) = text
         .chars()
         .filter(|c| c.is_alphabetic())
-        .filter(|c| (*c as u32) < 0x250)
-        .count();
-
-    let total_alpha = text.chars().filter(|c| c.is_alphabetic()).count();
+        .fold((0usize, 0usize), |(latin, total), c| {
+            (latin + ((c as u32) < 0x250) as usize, total + 1)
+        });
 
     if total_alpha == 0 {
         return true;
@@ -53,14 +58,20 @@ pub fn is_latin_script(text: &str) -> bool {
     (latin_count as f32 / total_alpha as f32) > 0.8
 }
 
-/// 格式化城市名（拉丁文加字间距，非拉丁文保持原样）
+/// 格式化城市名（拉丁文字符间插入单个空格，非拉丁文保持原样）
+/// 不做大小写转换：调用方传入的 display_city 已经大写
 pub fn format_city_name(city: &str) -> String {
     if is_latin_script(city) {
-        // 拉丁文：大写 + 双空格字间距
-        city.chars()
-            .map(|c| c.to_string())
-            .collect::<Vec<String>>()
-            .join(" ")
+        // 拉丁文：单空格字间距（大写由调用方完成）
+        // [优化] 直接写入预分配的 String，不为每个字符单独分配 String 再 join
+        let mut spaced = String::with_capacity(city.len() * 2);
+        for (i, c) in city.chars().enumerate() {
+            if i > 0 {
+                spaced.push(' ');
+            }
+            spaced.push(c);
+        }
+        spaced
     } else {
         // 非拉丁文：保持原样
         city.to_string()
@@ -69,16 +80,31 @@ pub fn format_city_name(city: &str) -> String {
 
 /// 格式化坐标显示
 pub fn format_coordinates(lat: f64, lon: f64) -> String {
-    let lat_dir = if lat >= 0.0 { "N" } else { "S" };
-    let lon_dir = if lon >= 0.0 { "E" } else { "W" };
-
-    format!(
-        "{:.4}° {} / {:.4}° {}",
-        lat.abs(),
-        lat_dir,
-        lon.abs(),
-        lon_dir
-    )
+    // 每个分量只格式化一次，半球直接按格式化后的数字判断：与显示的数字同源，
+    // -0.00001 显示为 0.0000 时不会标成 S / W，也不会因两套舍入规则不一致而错标
+    // Rust 的浮点格式化与 locale 无关，小数点固定为 '.'
+    let lat_s = format!("{:.4}", lat.abs());
+    let lon_s = format!("{:.4}", lon.abs());
+    let south = lat < 0.0 && !is_zero_digits(&lat_s);
+    let west = lon < 0.0 && !is_zero_digits(&lon_s);
+    let lat_dir = if south { "S" } else { "N" };
+    let lon_dir = if west { "W" } else { "E" };
+
+    let mut result = String::with_capacity(lat_s.len() + lon_s.len() + 16);
+    result.push_str(&lat_s);
+    result.push_str("° ");
+    result.push_str(lat_dir);
+    result.push_str(" / ");
+    result.push_str(&lon_s);
+    result.push_str("° ");
+    result.push_str(lon_dir);
+    result
+}
+
+/// 格式化后的数字是否全为 0（如 "0.0000"）
+#[inline]
+fn is_zero_digits(s: &str) -> bool {
+    s.bytes().all(|b| b == b'0' || b == b'.')
 }
 
 /// 动态计算字体大小
@@ -107,11 +133,25 @@ mod tests {
         assert!(is_latin_script("New York"));
         assert!(!is_latin_script("东京"));
         assert!(!is_latin_script("北京"));
+        assert!(is_latin_script("São Paulo"));
+        assert!(!is_latin_script("Москва"));
+        assert!(is_latin_script("123"));
+    }
+
+    #[test]
+    fn test_format_coordinates() {
+        assert_eq!(format_coordinates(48.8566, 2.3522), "48.8566° N / 2.3522° E");
+        assert_eq!(format_coordinates(-33.8688, -70.6693), "33.8688° S / 70.6693° W");
+        assert_eq!(format_coordinates(-0.00001, -0.00001), "0.0000° N / 0.0000° E");
+        assert_eq!(format_coordinates(-0.00005, -0.00005), "0.0001° S / 0.0001° W");
     }
 
     #[test]
     fn test_format_city_name() {
-        assert_eq!(format_city_name("Paris"), "P  A  R  I  S");
+        assert_eq!(format_city_name("PARIS"), "P A R I S");
+        // 不改变大小写
+        assert_eq!(format_city_name("Paris"), "P a r i s");
+        assert_eq!(format_city_name("SÃO PAULO"), "S Ã O   P A U L O");
         assert_eq!(format_city_name("东京"), "东京");
     }
 }